@@ -4,7 +4,7 @@ AST Node definitions for SHACL 1.2 Rules (Shape Rule Language).
 Based on Section 3: Shape Rules Abstract Syntax from the W3C specification.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from typing import List, Optional, Union
 
@@ -14,7 +14,7 @@ from typing import List, Optional, Union
 # ============================================================================
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IRI:
     """An IRI (Internationalized Resource Identifier)."""
 
@@ -24,7 +24,7 @@ class IRI:
         return f"<{self.value}>"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Literal:
     """An RDF Literal with optional language tag or datatype."""
 
@@ -40,7 +40,7 @@ class Literal:
         return f'"{self.value}"'
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BlankNode:
     """An RDF blank node."""
 
@@ -50,7 +50,7 @@ class BlankNode:
         return f"_:{self.label}"
 
 
-@dataclass(frozen=True, eq=True)
+@dataclass(frozen=True, eq=True, slots=True)
 class Variable:
     """
     A variable representing a possible RDF term in a triple pattern.
@@ -75,7 +75,7 @@ RDFTerm = Union[IRI, Literal, BlankNode, Variable]
 # ============================================================================
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InversePath:
     """Inverse property path (^property).
 
@@ -88,7 +88,7 @@ class InversePath:
         return f"^{self.path}"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PathSequence:
     """Sequence property path (path1/path2).
 
@@ -144,7 +144,7 @@ class UnaryOperator(Enum):
     MINUS = "-"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BinaryOp:
     """
     Binary operation expression.
@@ -157,7 +157,7 @@ class BinaryOp:
     right: "Expression"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UnaryOp:
     """
     Unary operation expression.
@@ -169,7 +169,7 @@ class UnaryOp:
     operand: "Expression"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FunctionCall:
     """
     Function call expression.
@@ -181,7 +181,7 @@ class FunctionCall:
     arguments: List["Expression"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BuiltInCall:
     """
     Built-in SPARQL function call.
@@ -193,7 +193,7 @@ class BuiltInCall:
     arguments: List["Expression"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ExistsExpression:
     """
     EXISTS or NOT EXISTS expression.
@@ -226,7 +226,7 @@ Expression = Union[
 # ============================================================================
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TriplePattern:
     """
     A triple pattern is a 3-tuple where each element is either a variable or an RDF term.
@@ -248,7 +248,7 @@ class TriplePattern:
         return f"{self.subject} {self.predicate} {self.object} ."
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TripleTemplate:
     """
     A triple template is a 3-tuple where each element is either a variable or an RDF term.
@@ -275,7 +275,7 @@ class TripleTemplate:
 # ============================================================================
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ConditionExpression:
     """
     A condition expression (FILTER) that evaluates to true or false.
@@ -292,7 +292,7 @@ class ConditionExpression:
         return f"FILTER ({self.expression})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class NegationElement:
     """
     A negation element (NOT { ... }).
@@ -309,7 +309,7 @@ class NegationElement:
         return f"NOT {{ {patterns_str} }}"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Assignment:
     """
     An assignment (BIND expression).
@@ -327,7 +327,7 @@ class Assignment:
         return f"BIND ({self.expression} AS {self.variable})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AggregationElement:
     """
     An aggregation element.
@@ -340,7 +340,7 @@ class AggregationElement:
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Annotation:
     """RDF-star annotation on a triple.
 
@@ -371,7 +371,7 @@ RuleBodyElement = Union[
 # ============================================================================
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RuleHead:
     """
     A rule head is a sequence of triple templates.
@@ -385,7 +385,7 @@ class RuleHead:
         return " ".join(str(t) for t in self.templates)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RuleBody:
     """
     A rule body is a sequence of rule body elements.
@@ -427,7 +427,7 @@ class Rule:
         return id(self)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DataBlock:
     """
     A data block is a set of triples.
@@ -450,7 +450,7 @@ class DataBlock:
 # ============================================================================
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TransitiveDeclaration:
     """Declaration that a predicate is transitive.
 
@@ -463,7 +463,7 @@ class TransitiveDeclaration:
         return f"TRANSITIVE({self.predicate})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SymmetricDeclaration:
     """Declaration that a predicate is symmetric.
 
@@ -476,7 +476,7 @@ class SymmetricDeclaration:
         return f"SYMMETRIC({self.predicate})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InverseDeclaration:
     """Declaration that two predicates are inverses of each other.
 
@@ -490,7 +490,7 @@ class InverseDeclaration:
         return f"INVERSE({self.predicate1}, {self.predicate2})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ReflexiveDeclaration:
     """Declaration that a predicate is reflexive.
 
@@ -553,6 +553,54 @@ class RuleSet:
         return "\n".join(parts)
 
 
+# ============================================================================
+# Structural keys
+# ============================================================================
+
+
+# Frozen node classes whose field names are cached on the class as _fields
+_STRUCTURAL_NODES = (
+    IRI,
+    Literal,
+    BlankNode,
+    Variable,
+    InversePath,
+    PathSequence,
+    BinaryOp,
+    UnaryOp,
+    FunctionCall,
+    BuiltInCall,
+    ExistsExpression,
+    TriplePattern,
+    TripleTemplate,
+    ConditionExpression,
+    NegationElement,
+    Assignment,
+    AggregationElement,
+    Annotation,
+    RuleHead,
+    RuleBody,
+    DataBlock,
+    TransitiveDeclaration,
+    SymmetricDeclaration,
+    InverseDeclaration,
+    ReflexiveDeclaration,
+)
+for _node_class in _STRUCTURAL_NODES:
+    _node_class._fields = tuple(f.name for f in fields(_node_class))
+del _node_class
+
+
+def structural_key(node):
+    """Hashable key for an AST node; lists inside nodes make them unhashable."""
+    if type(node) is list:
+        return tuple(structural_key(item) for item in node)
+    node_fields = getattr(type(node), "_fields", None)
+    if node_fields is None:
+        return node
+    return (type(node), *(structural_key(getattr(node, name)) for name in node_fields))
+
+
 # ============================================================================
 # Well-formedness Validation
 # ============================================================================
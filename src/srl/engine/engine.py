@@ -5,14 +5,21 @@ Implements Section 5.5 of the specification: rule set evaluation
 with stratification and fixpoint iteration.
 """
 
-from typing import List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-from rdflib import Graph
+from rdflib import Graph, URIRef
+from rdflib.graph import ReadOnlyGraphAggregate
 
-from .rules import eval_rule
-from .solutions import substitute_triple_template
-from .stratification import stratify_rules
-from ..ast.nodes import RuleSet, Rule
+from .rules import (
+    eval_rule,
+    eval_rule_delta,
+    eval_transitive_closure,
+    order_body_elements,
+    transitive_rule_predicate,
+)
+from .solutions import SolutionMapping, substitute_triple_template
+from .stratification import is_self_recursive, stratify_rules
+from ..ast.nodes import RuleSet, Rule, RuleBody, structural_key
 
 
 class RuleEngine:
@@ -25,17 +32,25 @@ class RuleEngine:
     3. Head instantiation: generate new triples from rule heads
     """
     
-    def __init__(self, rule_set: RuleSet, max_iterations: int = 1000):
+    def __init__(self, rule_set: RuleSet, max_iterations: int = 1000, store: str = "default"):
         """
         Initialize the rule engine.
         
         Args:
             rule_set: Set of rules to evaluate
             max_iterations: Maximum iterations per stratum (prevents infinite loops)
+            store: rdflib store plugin backing the copy evaluated when
+                inplace=False, e.g. "Oxigraph" with the oxigraph extra installed
         """
         self.rule_set = rule_set
         self.max_iterations = max_iterations
+        self.store = store
         self.strata: List[List[int]] = []
+        # Structural key of each rule's body, so rules with equal bodies share
+        # one evaluation per fixpoint iteration
+        self._body_keys: Dict[Rule, tuple] = {}
+        # Predicate of each rule that only states transitivity
+        self._transitive: Dict[Rule, URIRef] = {}
         
     def stratify(self) -> None:
         """
@@ -64,7 +79,8 @@ class RuleEngine:
            a. Initialize delta graph (new triples from this iteration)
            b. Repeat until fixpoint:
               - For each rule in stratum:
-                - Evaluate rule body against current graph
+                - Evaluate rule body against current graph (after the first
+                  iteration, only solutions using the previous delta)
                 - Instantiate rule head with solution mappings
                 - Add new triples to delta graph
               - If delta graph is empty: fixpoint reached, proceed to next stratum
@@ -72,7 +88,8 @@ class RuleEngine:
         
         Args:
             graph: RDF graph to evaluate rules against
-            inplace: If True, modify graph in place; if False, work on a copy
+            inplace: If True, modify graph in place; if False, work on and
+                return a copy on the engine's store
             results_only: If True, return only the resulting triples
             
         Returns:
@@ -88,28 +105,34 @@ class RuleEngine:
         if not self.strata:
             self.stratify()
 
-        result_graph = Graph()
+        if results_only:
+            # Match against the input and the inferences through a read-only
+            # view instead of copying the input; new triples go to inferred only
+            inferred = Graph()
+            view = ReadOnlyGraphAggregate([graph, inferred])
+            for stratum_num, rule_indices in enumerate(self.strata):
+                self._evaluate_stratum(stratum_num, rule_indices, view, inferred)
+            return inferred
 
         # Work on a copy if not inplace
         if inplace:
             result_graph = graph
         else:
+            result_graph = Graph(store=self.store)
             result_graph += graph
 
         # Evaluate each stratum in order
         for stratum_num, rule_indices in enumerate(self.strata):
             self._evaluate_stratum(stratum_num, rule_indices, result_graph)
 
-        if results_only:
-            return result_graph - graph
-        else:
-            return result_graph
+        return result_graph
     
     def _evaluate_stratum(
         self,
         stratum_num: int,
         rule_indices: List[int],
-        graph: Graph
+        graph: Graph,
+        target: Optional[Graph] = None
     ) -> None:
         """
         Evaluate a single stratum to fixpoint.
@@ -117,26 +140,33 @@ class RuleEngine:
         Args:
             stratum_num: Stratum number (for logging/debugging)
             rule_indices: Indices of rules in this stratum
-            graph: Graph to evaluate against and add inferred triples to
+            graph: Graph to evaluate against
+            target: Graph to add inferred triples to, defaulting to graph;
+                if given, graph must be a view that includes it
         """
+        if target is None:
+            target = graph
         iteration = 0
+        # Triples added in the previous iteration; None evaluates rules in full
+        previous_delta: Optional[Graph] = None
+        rules = self._plan_rules(rule_indices, graph)
+        single_pass = self._is_single_pass(rule_indices)
         
         while iteration < self.max_iterations:
             iteration += 1
             
             # Delta graph: new triples generated in this iteration
             delta = Graph()
+            body_solutions: Dict[tuple, List[SolutionMapping]] = {}
             
             # Apply each rule in the stratum
             for rule_idx in rule_indices:
-                rule = self.rule_set.rules[rule_idx]
-                new_triples = self._evaluate_single_rule(rule, graph)
+                new_triples = self._evaluate_single_rule(
+                    rules[rule_idx], graph, previous_delta, body_solutions
+                )
                 
-                # Add new triples to delta
-                for triple in new_triples:
-                    # Only add if not already in graph
-                    if triple not in graph:
-                        delta.add(triple)
+                # Add new triples to delta, only if not already in graph
+                delta.addN((s, p, o, delta) for s, p, o in new_triples if (s, p, o) not in graph)
             
             # Check for fixpoint
             if len(delta) == 0:
@@ -144,8 +174,11 @@ class RuleEngine:
                 break
             
             # Add delta triples to graph for next iteration
-            for triple in delta:
-                graph.add(triple)
+            target.addN((s, p, o, target) for s, p, o in delta)
+            previous_delta = delta
+            
+            if single_pass:
+                break
         
         if iteration >= self.max_iterations:
             # Warn about potential non-termination
@@ -155,10 +188,50 @@ class RuleEngine:
                 f"{self.max_iterations} iterations. Rules may not terminate."
             )
     
+    def _is_single_pass(self, rule_indices: List[int]) -> bool:
+        """
+        Check if a stratum reaches its fixpoint after one iteration.
+        
+        This holds for a stratum of one rule that cannot match its own
+        output: a second iteration could only rediscover the same triples.
+        """
+        return len(rule_indices) == 1 and not is_self_recursive(
+            self.rule_set.rules[rule_indices[0]]
+        )
+    
+    def _plan_rules(self, rule_indices: List[int], graph: Graph) -> Dict[int, Rule]:
+        """
+        Prepare the rules of a stratum for evaluation against graph.
+        
+        Each rule's body elements are reordered by order_body_elements using
+        the graph as it stands when the stratum starts, and rules that state
+        a predicate is transitive are noted for eval_transitive_closure.
+        
+        Args:
+            rule_indices: Indices of rules in the stratum
+            graph: Graph the stratum is evaluated against
+            
+        Returns:
+            Planned rules keyed by rule index
+        """
+        self._body_keys = {}
+        self._transitive = {}
+        planned = {}
+        for rule_idx in rule_indices:
+            rule = self.rule_set.rules[rule_idx]
+            body = RuleBody(elements=order_body_elements(rule.body.elements, graph))
+            planned[rule_idx] = Rule(head=rule.head, body=body)
+            predicate = transitive_rule_predicate(rule)
+            if predicate is not None:
+                self._transitive[planned[rule_idx]] = URIRef(predicate.value)
+        return planned
+    
     def _evaluate_single_rule(
         self,
         rule: Rule,
-        graph: Graph
+        graph: Graph,
+        delta: Optional[Graph] = None,
+        body_solutions: Optional[Dict[tuple, List[SolutionMapping]]] = None
     ) -> Set[Tuple]:
         """
         Evaluate a single rule and generate new triples.
@@ -166,12 +239,35 @@ class RuleEngine:
         Args:
             rule: Rule to evaluate
             graph: Graph to evaluate against
+            delta: Triples added to graph in the previous iteration; if given,
+                only solutions using at least one of them are produced
+            body_solutions: Solutions of the bodies already evaluated against
+                the same graph and delta, keyed by structural body key
             
         Returns:
             Set of new triples (subject, predicate, object)
         """
-        # Evaluate rule body to get solution mappings
-        solution_mappings = eval_rule(rule, graph)
+        # A transitivity rule gets the whole closure in one pass
+        predicate = self._transitive.get(rule)
+        if predicate is not None:
+            return {
+                (s, predicate, o) for s, o in eval_transitive_closure(graph, predicate, delta)
+            }
+        
+        # Evaluate rule body to get solution mappings, reusing those of an
+        # equal body evaluated earlier in this iteration
+        key = self._body_keys.get(rule)
+        if key is None:
+            key = self._body_keys[rule] = structural_key(rule.body.elements)
+        if body_solutions is not None and key in body_solutions:
+            solution_mappings = body_solutions[key]
+        else:
+            if delta is None:
+                solution_mappings = eval_rule(rule, graph)
+            else:
+                solution_mappings = eval_rule_delta(rule, graph, delta)
+            if body_solutions is not None:
+                body_solutions[key] = solution_mappings
         
         # Generate new triples by instantiating head templates
         new_triples = set()
@@ -208,9 +304,8 @@ class RuleEngine:
         
         # Work on a copy if not inplace
         if not inplace:
-            result_graph = Graph()
-            for triple in graph:
-                result_graph.add(triple)
+            result_graph = Graph(store=self.store)
+            result_graph += graph
             graph = result_graph
         
         provenance = []
@@ -218,31 +313,40 @@ class RuleEngine:
         # Evaluate each stratum
         for stratum_num, rule_indices in enumerate(self.strata):
             iteration = 0
+            previous_delta = None
+            rules = self._plan_rules(rule_indices, graph)
+            single_pass = self._is_single_pass(rule_indices)
             
             while iteration < self.max_iterations:
                 iteration += 1
                 delta = Graph()
                 delta_provenance = []
+                body_solutions = {}
                 
                 # Apply each rule
                 for rule_idx in rule_indices:
-                    rule = self.rule_set.rules[rule_idx]
-                    new_triples = self._evaluate_single_rule(rule, graph)
+                    new_triples = self._evaluate_single_rule(
+                        rules[rule_idx], graph, previous_delta, body_solutions
+                    )
                     
-                    for triple in new_triples:
-                        if triple not in graph:
-                            delta.add(triple)
-                            delta_provenance.append((triple, rule_idx, stratum_num))
+                    new_triples = [triple for triple in new_triples if triple not in graph]
+                    delta.addN((s, p, o, delta) for s, p, o in new_triples)
+                    delta_provenance.extend(
+                        (triple, rule_idx, stratum_num) for triple in new_triples
+                    )
                 
                 # Check fixpoint
                 if len(delta) == 0:
                     break
                 
                 # Add to graph and record provenance
-                for triple in delta:
-                    graph.add(triple)
+                graph.addN((s, p, o, graph) for s, p, o in delta)
+                previous_delta = delta
                 
                 provenance.extend(delta_provenance)
+                
+                if single_pass:
+                    break
             
             if iteration >= self.max_iterations:
                 import warnings
@@ -281,7 +385,8 @@ def evaluate_rules(
     rule_set: RuleSet,
     graph: Graph,
     inplace: bool = True,
-    max_iterations: int = 1000
+    max_iterations: int = 1000,
+    store: str = "default"
 ) -> Graph:
     """
     Convenience function to evaluate a rule set.
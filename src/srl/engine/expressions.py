@@ -5,8 +5,10 @@ Implements Section 5.2 of the specification: expression evaluation,
 built-in functions, operators, and effective boolean values.
 """
 
+import operator
 import re
-from typing import Union, Optional
+from functools import lru_cache
+from typing import Callable, Union, Optional
 
 from rdflib import Literal as RDFLiteral, URIRef, BNode, Namespace
 from rdflib.term import Node as RDFNode
@@ -22,6 +24,41 @@ from ..ast.nodes import (
 XSD = Namespace("http://www.w3.org/2001/XMLSchema#")
 RDF = Namespace("http://www.w3.org/1999/02/22-rdf-syntax-ns#")
 
+# Datatype IRIs resolved once; Namespace attribute access builds a new URIRef per call
+XSD_BOOLEAN = XSD.boolean
+XSD_BYTE = XSD.byte
+XSD_DATE_TIME = XSD.dateTime
+XSD_DECIMAL = XSD.decimal
+XSD_DOUBLE = XSD.double
+XSD_FLOAT = XSD.float
+XSD_INT = XSD.int
+XSD_INTEGER = XSD.integer
+XSD_LONG = XSD.long
+XSD_NEGATIVE_INTEGER = XSD.negativeInteger
+XSD_NON_NEGATIVE_INTEGER = XSD.nonNegativeInteger
+XSD_NON_POSITIVE_INTEGER = XSD.nonPositiveInteger
+XSD_POSITIVE_INTEGER = XSD.positiveInteger
+XSD_SHORT = XSD.short
+XSD_STRING = XSD.string
+XSD_UNSIGNED_BYTE = XSD.unsignedByte
+XSD_UNSIGNED_INT = XSD.unsignedInt
+XSD_UNSIGNED_LONG = XSD.unsignedLong
+XSD_UNSIGNED_SHORT = XSD.unsignedShort
+RDF_LANG_STRING = RDF.langString
+
+# Datatype sets are frozensets so membership is one hash probe rather than an
+# rdflib __eq__ call per candidate
+_NUMERIC_DATATYPES = frozenset({
+    XSD_INTEGER, XSD_DECIMAL, XSD_DOUBLE, XSD_FLOAT,
+    XSD_INT, XSD_LONG, XSD_SHORT, XSD_BYTE,
+    XSD_NON_NEGATIVE_INTEGER, XSD_POSITIVE_INTEGER,
+    XSD_UNSIGNED_LONG, XSD_UNSIGNED_INT, XSD_UNSIGNED_SHORT, XSD_UNSIGNED_BYTE,
+    XSD_NON_POSITIVE_INTEGER, XSD_NEGATIVE_INTEGER,
+})
+_EBV_NUMERIC_DATATYPES = frozenset({XSD_INTEGER, XSD_DECIMAL, XSD_DOUBLE, XSD_FLOAT})
+_FLOAT_DATATYPES = frozenset({XSD_DOUBLE, XSD_FLOAT})
+_SIMPLE_STRING_DATATYPES = frozenset({None, XSD_STRING})
+
 
 class EvaluationError(Exception):
     """Error during expression evaluation."""
@@ -95,7 +132,7 @@ def effective_boolean_value(term: Optional[RDFNode]) -> bool:
     
     if isinstance(term, RDFLiteral):
         # Boolean literal
-        if term.datatype == XSD.boolean:
+        if term.datatype == XSD_BOOLEAN:
             # Value might be Python bool or string
             if isinstance(term.value, bool):
                 return term.value
@@ -103,11 +140,11 @@ def effective_boolean_value(term: Optional[RDFNode]) -> bool:
                 return str(term.value).lower() in ('true', '1')
         
         # String literal
-        if term.datatype == XSD.string or term.datatype is None:
+        if term.datatype == XSD_STRING or term.datatype is None:
             return len(str(term)) > 0
         
         # Numeric types
-        if term.datatype in (XSD.integer, XSD.decimal, XSD.double, XSD.float):
+        if term.datatype in _EBV_NUMERIC_DATATYPES:
             try:
                 num_val = float(term.value)
                 return num_val != 0.0 and not (num_val != num_val)  # not NaN
@@ -154,22 +191,22 @@ def eval_binary_op(
     # Comparison operators
     if expr.operator == BinaryOperator.EQ:
         result = rdf_equal(left_val, right_val)
-        return RDFLiteral(result, datatype=XSD.boolean)
+        return RDFLiteral(result, datatype=XSD_BOOLEAN)
     elif expr.operator == BinaryOperator.NE:
         result = not rdf_equal(left_val, right_val)
-        return RDFLiteral(result, datatype=XSD.boolean)
+        return RDFLiteral(result, datatype=XSD_BOOLEAN)
     elif expr.operator == BinaryOperator.LT:
         result = rdf_compare(left_val, right_val) < 0
-        return RDFLiteral(result, datatype=XSD.boolean)
+        return RDFLiteral(result, datatype=XSD_BOOLEAN)
     elif expr.operator == BinaryOperator.LE:
         result = rdf_compare(left_val, right_val) <= 0
-        return RDFLiteral(result, datatype=XSD.boolean)
+        return RDFLiteral(result, datatype=XSD_BOOLEAN)
     elif expr.operator == BinaryOperator.GT:
         result = rdf_compare(left_val, right_val) > 0
-        return RDFLiteral(result, datatype=XSD.boolean)
+        return RDFLiteral(result, datatype=XSD_BOOLEAN)
     elif expr.operator == BinaryOperator.GE:
         result = rdf_compare(left_val, right_val) >= 0
-        return RDFLiteral(result, datatype=XSD.boolean)
+        return RDFLiteral(result, datatype=XSD_BOOLEAN)
     
     # Arithmetic operators
     elif expr.operator == BinaryOperator.ADD:
@@ -185,6 +222,60 @@ def eval_binary_op(
         raise EvaluationError(f"Unknown binary operator: {expr.operator}")
 
 
+# Ordering comparisons that the numeric filter fast path handles, and the
+# operator to use when the constant is on the left
+_NUMERIC_COMPARISONS = {
+    BinaryOperator.LT: (operator.lt, operator.gt),
+    BinaryOperator.LE: (operator.le, operator.ge),
+    BinaryOperator.GT: (operator.gt, operator.lt),
+    BinaryOperator.GE: (operator.ge, operator.le),
+}
+
+
+def numeric_comparison_filter(
+    expr: Expression
+) -> Optional[Callable[[SolutionMapping], bool]]:
+    """
+    Specialise a filter of the form ?var OP constant for a numeric constant.
+    
+    Returns a predicate equal to EBV(eval(expr, μ)) that compares numeric
+    bindings directly, without dispatching through eval_expr or allocating a
+    boolean literal per mapping. Bindings that are not numeric take the
+    generic path. Returns None if expr does not have this shape.
+    """
+    if type(expr) is not BinaryOp or expr.operator not in _NUMERIC_COMPARISONS:
+        return None
+    if type(expr.left) is Variable and type(expr.right) is Literal:
+        return _compile_numeric_comparison(expr, expr.left.name, expr.right, False)
+    if type(expr.left) is Literal and type(expr.right) is Variable:
+        return _compile_numeric_comparison(expr, expr.right.name, expr.left, True)
+    return None
+
+
+@lru_cache(maxsize=256)
+def _compile_numeric_comparison(
+    expr: BinaryOp, name: str, constant: Literal, flipped: bool
+) -> Optional[Callable[[SolutionMapping], bool]]:
+    constant = substitute_term(constant, SolutionMapping())
+    if not is_numeric(constant):
+        return None
+    try:
+        bound = numeric_value(constant)
+    except ValueError:
+        return None
+    compare = _NUMERIC_COMPARISONS[expr.operator][flipped]
+    
+    def test(mu: SolutionMapping) -> bool:
+        value = mu.bindings.get(name)
+        if value is None:
+            return False
+        if is_numeric(value):
+            return compare(numeric_value(value), bound)
+        return effective_boolean_value(eval_expr(expr, mu))
+    
+    return test
+
+
 def eval_unary_op(
     expr: UnaryOp,
     mu: SolutionMapping,
@@ -232,105 +323,13 @@ def eval_builtin(
         arg_val = eval_expr(arg_expr, mu, active_graph)
         args.append(arg_val)
     
-    # Dispatch to specific built-in
-    if func_name == "STR":
-        return builtin_str(args)
-    elif func_name == "LANG":
-        return builtin_lang(args)
-    elif func_name == "LANGMATCHES":
-        return builtin_langmatches(args)
-    elif func_name == "DATATYPE":
-        return builtin_datatype(args)
-    elif func_name == "BOUND":
+    # Built-ins that control how their arguments are evaluated
+    if func_name == "BOUND":
         # Special: BOUND doesn't evaluate its argument
         if len(call.arguments) == 1 and isinstance(call.arguments[0], Variable):
             var = call.arguments[0]
             return RDFLiteral(var.name in mu)
         return RDFLiteral(False)
-    elif func_name == "IRI" or func_name == "URI":
-        return builtin_iri(args)
-    elif func_name == "BNODE":
-        return builtin_bnode(args)
-    elif func_name == "STRDT":
-        return builtin_strdt(args)
-    elif func_name == "STRLANG":
-        return builtin_strlang(args)
-    elif func_name == "UUID":
-        return builtin_uuid(args)
-    elif func_name == "STRUUID":
-        return builtin_struuid(args)
-    elif func_name == "STRLEN":
-        return builtin_strlen(args)
-    elif func_name == "SUBSTR":
-        return builtin_substr(args)
-    elif func_name == "UCASE":
-        return builtin_ucase(args)
-    elif func_name == "LCASE":
-        return builtin_lcase(args)
-    elif func_name == "STRSTARTS":
-        return builtin_strstarts(args)
-    elif func_name == "STRENDS":
-        return builtin_strends(args)
-    elif func_name == "CONTAINS":
-        return builtin_contains(args)
-    elif func_name == "STRBEFORE":
-        return builtin_strbefore(args)
-    elif func_name == "STRAFTER":
-        return builtin_strafter(args)
-    elif func_name == "ENCODE_FOR_URI":
-        return builtin_encode_for_uri(args)
-    elif func_name == "CONCAT":
-        return builtin_concat(args)
-    elif func_name == "REPLACE":
-        return builtin_replace(args)
-    elif func_name == "ABS":
-        return builtin_abs(args)
-    elif func_name == "ROUND":
-        return builtin_round(args)
-    elif func_name == "CEIL":
-        return builtin_ceil(args)
-    elif func_name == "FLOOR":
-        return builtin_floor(args)
-    elif func_name == "RAND":
-        return builtin_rand(args)
-    elif func_name == "NOW":
-        return builtin_now(args)
-    elif func_name == "YEAR":
-        return builtin_year(args)
-    elif func_name == "MONTH":
-        return builtin_month(args)
-    elif func_name == "DAY":
-        return builtin_day(args)
-    elif func_name == "HOURS":
-        return builtin_hours(args)
-    elif func_name == "MINUTES":
-        return builtin_minutes(args)
-    elif func_name == "SECONDS":
-        return builtin_seconds(args)
-    elif func_name == "TIMEZONE":
-        return builtin_timezone(args)
-    elif func_name == "TZ":
-        return builtin_tz(args)
-    elif func_name == "MD5":
-        return builtin_md5(args)
-    elif func_name == "SHA1":
-        return builtin_sha1(args)
-    elif func_name == "SHA256":
-        return builtin_sha256(args)
-    elif func_name == "SHA384":
-        return builtin_sha384(args)
-    elif func_name == "SHA512":
-        return builtin_sha512(args)
-    elif func_name == "ISIRI" or func_name == "ISURI":
-        return builtin_isiri(args)
-    elif func_name == "ISBLANK":
-        return builtin_isblank(args)
-    elif func_name == "ISLITERAL":
-        return builtin_isliteral(args)
-    elif func_name == "ISNUMERIC":
-        return builtin_isnumeric(args)
-    elif func_name == "REGEX":
-        return builtin_regex(args)
     elif func_name == "IF":
         # Special: IF has conditional evaluation
         if len(call.arguments) == 3:
@@ -357,9 +356,14 @@ def eval_builtin(
             if rdf_equal(test_val, candidate):
                 return RDFLiteral(True)
         return RDFLiteral(False)
-    else:
-        # Unknown built-in function
-        raise EvaluationError(f"Unknown built-in function: {func_name}")
+    
+    # Dispatch to specific built-in
+    builtin = _BUILTINS.get(func_name)
+    if builtin is not None:
+        return builtin(args)
+    
+    # Unknown built-in function
+    raise EvaluationError(f"Unknown built-in function: {func_name}")
 
 
 def eval_function_call(
@@ -429,9 +433,9 @@ def builtin_datatype(args) -> Optional[RDFNode]:
         if term.datatype:
             return term.datatype
         elif term.language:
-            return RDF.langString
+            return RDF_LANG_STRING
         else:
-            return XSD.string
+            return XSD_STRING
     return None
 
 
@@ -502,7 +506,7 @@ def builtin_strlen(args) -> Optional[RDFNode]:
         return None
     
     s = str(args[0])
-    return RDFLiteral(len(s), datatype=XSD.integer)
+    return RDFLiteral(len(s), datatype=XSD_INTEGER)
 
 
 def builtin_substr(args) -> Optional[RDFNode]:
@@ -658,7 +662,7 @@ def builtin_round(args) -> Optional[RDFNode]:
     if isinstance(args[0], RDFLiteral) and is_numeric(args[0]):
         val = numeric_value(args[0])
         result = round(val)
-        return RDFLiteral(int(result), datatype=XSD.integer)
+        return RDFLiteral(int(result), datatype=XSD_INTEGER)
     return None
 
 
@@ -671,7 +675,7 @@ def builtin_ceil(args) -> Optional[RDFNode]:
         import math
         val = numeric_value(args[0])
         result = math.ceil(val)
-        return RDFLiteral(int(result), datatype=XSD.integer)
+        return RDFLiteral(int(result), datatype=XSD_INTEGER)
     return None
 
 
@@ -684,21 +688,21 @@ def builtin_floor(args) -> Optional[RDFNode]:
         import math
         val = numeric_value(args[0])
         result = math.floor(val)
-        return RDFLiteral(int(result), datatype=XSD.integer)
+        return RDFLiteral(int(result), datatype=XSD_INTEGER)
     return None
 
 
 def builtin_rand(args) -> Optional[RDFNode]:
     """RAND() - random number between 0 and 1."""
     import random
-    return RDFLiteral(random.random(), datatype=XSD.double)
+    return RDFLiteral(random.random(), datatype=XSD_DOUBLE)
 
 
 def builtin_now(args) -> Optional[RDFNode]:
     """NOW() - current datetime."""
     from datetime import datetime, timezone
     now = datetime.now(timezone.utc)
-    return RDFLiteral(now.isoformat(), datatype=XSD.dateTime)
+    return RDFLiteral(now.isoformat(), datatype=XSD_DATE_TIME)
 
 
 def builtin_year(args) -> Optional[RDFNode]:
@@ -859,6 +863,59 @@ def builtin_regex(args) -> Optional[RDFNode]:
         return None
 
 
+# Built-ins that take their already evaluated arguments, by upper-case name
+_BUILTINS = {
+    "STR": builtin_str,
+    "LANG": builtin_lang,
+    "LANGMATCHES": builtin_langmatches,
+    "DATATYPE": builtin_datatype,
+    "IRI": builtin_iri,
+    "URI": builtin_iri,
+    "BNODE": builtin_bnode,
+    "STRDT": builtin_strdt,
+    "STRLANG": builtin_strlang,
+    "UUID": builtin_uuid,
+    "STRUUID": builtin_struuid,
+    "STRLEN": builtin_strlen,
+    "SUBSTR": builtin_substr,
+    "UCASE": builtin_ucase,
+    "LCASE": builtin_lcase,
+    "STRSTARTS": builtin_strstarts,
+    "STRENDS": builtin_strends,
+    "CONTAINS": builtin_contains,
+    "STRBEFORE": builtin_strbefore,
+    "STRAFTER": builtin_strafter,
+    "ENCODE_FOR_URI": builtin_encode_for_uri,
+    "CONCAT": builtin_concat,
+    "REPLACE": builtin_replace,
+    "ABS": builtin_abs,
+    "ROUND": builtin_round,
+    "CEIL": builtin_ceil,
+    "FLOOR": builtin_floor,
+    "RAND": builtin_rand,
+    "NOW": builtin_now,
+    "YEAR": builtin_year,
+    "MONTH": builtin_month,
+    "DAY": builtin_day,
+    "HOURS": builtin_hours,
+    "MINUTES": builtin_minutes,
+    "SECONDS": builtin_seconds,
+    "TIMEZONE": builtin_timezone,
+    "TZ": builtin_tz,
+    "MD5": builtin_md5,
+    "SHA1": builtin_sha1,
+    "SHA256": builtin_sha256,
+    "SHA384": builtin_sha384,
+    "SHA512": builtin_sha512,
+    "ISIRI": builtin_isiri,
+    "ISURI": builtin_isiri,
+    "ISBLANK": builtin_isblank,
+    "ISLITERAL": builtin_isliteral,
+    "ISNUMERIC": builtin_isnumeric,
+    "REGEX": builtin_regex,
+}
+
+
 # ===========================================================================
 # Helper functions
 # ===========================================================================
@@ -868,20 +925,14 @@ def is_numeric(term: RDFLiteral) -> bool:
     if not isinstance(term, RDFLiteral):
         return False
     
-    return term.datatype in (
-        XSD.integer, XSD.decimal, XSD.double, XSD.float,
-        XSD.int, XSD.long, XSD.short, XSD.byte,
-        XSD.nonNegativeInteger, XSD.positiveInteger,
-        XSD.unsignedLong, XSD.unsignedInt, XSD.unsignedShort, XSD.unsignedByte,
-        XSD.nonPositiveInteger, XSD.negativeInteger,
-    )
+    return term.datatype in _NUMERIC_DATATYPES
 
 
 def numeric_value(term: RDFLiteral) -> Union[int, float]:
     """Extract numeric value from literal."""
-    if term.datatype in (XSD.double, XSD.float):
+    if term.datatype in _FLOAT_DATATYPES:
         return float(term.value)
-    elif term.datatype == XSD.decimal:
+    elif term.datatype == XSD_DECIMAL:
         return float(term.value)  # Could use Decimal for precision
     else:
         return int(term.value)
@@ -906,7 +957,8 @@ def rdf_equal(term1: RDFNode, term2: RDFNode) -> bool:
         
         # String comparison
         if (term1.datatype == term2.datatype or 
-            (term1.datatype in (None, XSD.string) and term2.datatype in (None, XSD.string))):
+            (term1.datatype in _SIMPLE_STRING_DATATYPES
+             and term2.datatype in _SIMPLE_STRING_DATATYPES)):
             return str(term1) == str(term2)
     
     return False
@@ -962,14 +1014,14 @@ def numeric_add(term1: RDFNode, term2: RDFNode) -> Optional[RDFNode]:
     result = val1 + val2
     
     # Result datatype promotion
-    if term1.datatype == XSD.double or term2.datatype == XSD.double:
-        return RDFLiteral(result, datatype=XSD.double)
-    elif term1.datatype == XSD.float or term2.datatype == XSD.float:
-        return RDFLiteral(result, datatype=XSD.float)
-    elif term1.datatype == XSD.decimal or term2.datatype == XSD.decimal:
-        return RDFLiteral(result, datatype=XSD.decimal)
+    if term1.datatype == XSD_DOUBLE or term2.datatype == XSD_DOUBLE:
+        return RDFLiteral(result, datatype=XSD_DOUBLE)
+    elif term1.datatype == XSD_FLOAT or term2.datatype == XSD_FLOAT:
+        return RDFLiteral(result, datatype=XSD_FLOAT)
+    elif term1.datatype == XSD_DECIMAL or term2.datatype == XSD_DECIMAL:
+        return RDFLiteral(result, datatype=XSD_DECIMAL)
     else:
-        return RDFLiteral(int(result), datatype=XSD.integer)
+        return RDFLiteral(int(result), datatype=XSD_INTEGER)
 
 
 def numeric_subtract(term1: RDFNode, term2: RDFNode) -> Optional[RDFNode]:
@@ -983,14 +1035,14 @@ def numeric_subtract(term1: RDFNode, term2: RDFNode) -> Optional[RDFNode]:
     val2 = numeric_value(term2)
     result = val1 - val2
     
-    if term1.datatype == XSD.double or term2.datatype == XSD.double:
-        return RDFLiteral(result, datatype=XSD.double)
-    elif term1.datatype == XSD.float or term2.datatype == XSD.float:
-        return RDFLiteral(result, datatype=XSD.float)
-    elif term1.datatype == XSD.decimal or term2.datatype == XSD.decimal:
-        return RDFLiteral(result, datatype=XSD.decimal)
+    if term1.datatype == XSD_DOUBLE or term2.datatype == XSD_DOUBLE:
+        return RDFLiteral(result, datatype=XSD_DOUBLE)
+    elif term1.datatype == XSD_FLOAT or term2.datatype == XSD_FLOAT:
+        return RDFLiteral(result, datatype=XSD_FLOAT)
+    elif term1.datatype == XSD_DECIMAL or term2.datatype == XSD_DECIMAL:
+        return RDFLiteral(result, datatype=XSD_DECIMAL)
     else:
-        return RDFLiteral(int(result), datatype=XSD.integer)
+        return RDFLiteral(int(result), datatype=XSD_INTEGER)
 
 
 def numeric_multiply(term1: RDFNode, term2: RDFNode) -> Optional[RDFNode]:
@@ -1004,14 +1056,14 @@ def numeric_multiply(term1: RDFNode, term2: RDFNode) -> Optional[RDFNode]:
     val2 = numeric_value(term2)
     result = val1 * val2
     
-    if term1.datatype == XSD.double or term2.datatype == XSD.double:
-        return RDFLiteral(result, datatype=XSD.double)
-    elif term1.datatype == XSD.float or term2.datatype == XSD.float:
-        return RDFLiteral(result, datatype=XSD.float)
-    elif term1.datatype == XSD.decimal or term2.datatype == XSD.decimal:
-        return RDFLiteral(result, datatype=XSD.decimal)
+    if term1.datatype == XSD_DOUBLE or term2.datatype == XSD_DOUBLE:
+        return RDFLiteral(result, datatype=XSD_DOUBLE)
+    elif term1.datatype == XSD_FLOAT or term2.datatype == XSD_FLOAT:
+        return RDFLiteral(result, datatype=XSD_FLOAT)
+    elif term1.datatype == XSD_DECIMAL or term2.datatype == XSD_DECIMAL:
+        return RDFLiteral(result, datatype=XSD_DECIMAL)
     else:
-        return RDFLiteral(int(result), datatype=XSD.integer)
+        return RDFLiteral(int(result), datatype=XSD_INTEGER)
 
 
 def numeric_divide(term1: RDFNode, term2: RDFNode) -> Optional[RDFNode]:
@@ -1030,10 +1082,10 @@ def numeric_divide(term1: RDFNode, term2: RDFNode) -> Optional[RDFNode]:
     result = val1 / val2
     
     # Division always produces decimal or double
-    if term1.datatype == XSD.double or term2.datatype == XSD.double:
-        return RDFLiteral(result, datatype=XSD.double)
+    if term1.datatype == XSD_DOUBLE or term2.datatype == XSD_DOUBLE:
+        return RDFLiteral(result, datatype=XSD_DOUBLE)
     else:
-        return RDFLiteral(result, datatype=XSD.decimal)
+        return RDFLiteral(result, datatype=XSD_DECIMAL)
 
 
 def numeric_negate(term: RDFNode) -> Optional[RDFNode]:
@@ -1045,3 +1097,168 @@ def numeric_negate(term: RDFNode) -> Optional[RDFNode]:
     result = -val
     
     return RDFLiteral(result, datatype=term.datatype)
+
+
+# ===========================================================================
+# Expression compilation
+# ===========================================================================
+
+_BINARY_FUNCTIONS = {
+    BinaryOperator.EQ: lambda left, right: RDFLiteral(rdf_equal(left, right), datatype=XSD_BOOLEAN),
+    BinaryOperator.NE: lambda left, right: RDFLiteral(
+        not rdf_equal(left, right), datatype=XSD_BOOLEAN
+    ),
+    BinaryOperator.LT: lambda left, right: RDFLiteral(
+        rdf_compare(left, right) < 0, datatype=XSD_BOOLEAN
+    ),
+    BinaryOperator.LE: lambda left, right: RDFLiteral(
+        rdf_compare(left, right) <= 0, datatype=XSD_BOOLEAN
+    ),
+    BinaryOperator.GT: lambda left, right: RDFLiteral(
+        rdf_compare(left, right) > 0, datatype=XSD_BOOLEAN
+    ),
+    BinaryOperator.GE: lambda left, right: RDFLiteral(
+        rdf_compare(left, right) >= 0, datatype=XSD_BOOLEAN
+    ),
+    BinaryOperator.ADD: numeric_add,
+    BinaryOperator.SUB: numeric_subtract,
+    BinaryOperator.MUL: numeric_multiply,
+    BinaryOperator.DIV: numeric_divide,
+}
+
+
+def compile_expr(
+    expr: Expression,
+    active_graph=None
+) -> Callable[[SolutionMapping], Optional[RDFNode]]:
+    """
+    Compile an expression into a function of a solution mapping.
+    
+    The result computes eval(expr, μ, G) for any μ. The type and operator
+    dispatch of eval_expr is resolved once here, so evaluating the same
+    expression over many mappings does not walk the AST again each time.
+    Expressions with no specialised form (IF, COALESCE, IN, BOUND, custom
+    functions) are evaluated through eval_expr.
+    
+    Args:
+        expr: Expression to compile
+        active_graph: Optional RDF graph for graph-dependent operations
+        
+    Returns:
+        Function mapping a solution mapping to an RDF term, or None on error
+    """
+    expr_type = type(expr)
+    
+    if expr_type is Variable:
+        name = expr.name
+        return lambda mu: mu.bindings.get(name)
+    
+    if expr_type is IRI or expr_type is Literal:
+        value = substitute_term(expr, SolutionMapping())
+        return lambda mu: value
+    
+    if expr_type is BinaryOp:
+        return _compile_binary_op(expr, active_graph)
+    
+    if expr_type is UnaryOp:
+        return _compile_unary_op(expr, active_graph)
+    
+    if (
+        expr_type is BuiltInCall
+        and expr.function_name.upper() == "CONCAT"
+        and all(type(arg) is Variable or type(arg) is Literal for arg in expr.arguments)
+    ):
+        return _compile_concat(expr.arguments)
+    
+    if expr_type is BuiltInCall and expr.function_name.upper() in _BUILTINS:
+        builtin = _BUILTINS[expr.function_name.upper()]
+        arguments = [compile_expr(arg, active_graph) for arg in expr.arguments]
+        
+        def call(mu):
+            args = [argument(mu) for argument in arguments]
+            try:
+                return builtin(args)
+            except EvaluationError:
+                return None
+        
+        return call
+    
+    return lambda mu: eval_expr(expr, mu, active_graph)
+
+
+def _compile_binary_op(expr: BinaryOp, active_graph):
+    left = compile_expr(expr.left, active_graph)
+    right = compile_expr(expr.right, active_graph)
+    
+    # Short-circuit evaluation for logical operators
+    if expr.operator == BinaryOperator.OR:
+        def logical_or(mu):
+            if effective_boolean_value(left(mu)):
+                return RDFLiteral(True)
+            return RDFLiteral(effective_boolean_value(right(mu)))
+        return logical_or
+    
+    if expr.operator == BinaryOperator.AND:
+        def logical_and(mu):
+            if not effective_boolean_value(left(mu)):
+                return RDFLiteral(False)
+            return RDFLiteral(effective_boolean_value(right(mu)))
+        return logical_and
+    
+    function = _BINARY_FUNCTIONS.get(expr.operator)
+    if function is None:
+        return lambda mu: eval_expr(expr, mu, active_graph)
+    
+    def binary(mu):
+        left_val = left(mu)
+        right_val = right(mu)
+        if left_val is None or right_val is None:
+            return None
+        try:
+            return function(left_val, right_val)
+        except EvaluationError:
+            return None
+    
+    return binary
+
+
+def _compile_concat(arguments):
+    """
+    CONCAT over variables and literal constants, e.g. CONCAT(?first, " ", ?last).
+    
+    The constants are converted to text once and each call only looks up the
+    variables, joining the lexical forms as builtin_concat does.
+    """
+    empty = SolutionMapping()
+    pieces = [
+        (arg.name, None) if type(arg) is Variable else (None, str(substitute_term(arg, empty)))
+        for arg in arguments
+    ]
+    
+    def concat(mu):
+        bindings = mu.bindings
+        texts = []
+        for name, text in pieces:
+            if name is not None:
+                text = bindings.get(name)
+                if text is None:
+                    return None
+            texts.append(text)
+        return RDFLiteral("".join(texts))
+    
+    return concat
+
+
+def _compile_unary_op(expr: UnaryOp, active_graph):
+    if expr.operator == UnaryOperator.NOT:
+        operand = compile_expr(expr.operand, active_graph)
+        
+        def logical_not(mu):
+            value = operand(mu)
+            if value is None:
+                return None
+            return RDFLiteral(not effective_boolean_value(value))
+        
+        return logical_not
+    
+    return lambda mu: eval_expr(expr, mu, active_graph)
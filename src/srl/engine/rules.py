@@ -5,19 +5,24 @@ Implements Section 5.3 of the specification: evaluating a single rule
 to produce solution mappings from the rule body.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
-from rdflib import Graph
+from rdflib import Graph, URIRef
+from rdflib.term import Node
 
-from .expressions import eval_expr, effective_boolean_value
+from .expressions import compile_expr, effective_boolean_value, numeric_comparison_filter
 from .solutions import (
-    SolutionMapping, graphMatch, join, minus, extend
+    SolutionMapping, estimate_cardinality, join_pattern, minus, extend
 )
 from ..ast.nodes import (
-    Rule, RuleBody, RuleBodyElement,
+    Rule, RuleHead, RuleBody, RuleBodyElement,
     TriplePattern, ConditionExpression, NegationElement, Assignment,
+    InversePath, PathSequence, Variable, ExistsExpression, IRI,
 )
 
+# Closures over fewer nodes than this are computed on int bitsets
+_BITSET_CLOSURE_LIMIT = 4096
+
 
 def eval_rule(
     rule: Rule,
@@ -63,6 +68,59 @@ def eval_rule(
     return omega
 
 
+def eval_rule_delta(
+    rule: Rule,
+    graph: Graph,
+    delta: Graph,
+    active_graph: Optional[Graph] = None
+) -> List[SolutionMapping]:
+    """
+    Evaluate a rule body semi-naively against the triples added last round.
+    
+    For each triple pattern of the body in turn, that pattern is matched
+    against delta while every other element sees the full graph (which
+    already contains delta). The union covers every solution that uses at
+    least one new triple; solutions built only from older triples were
+    produced in an earlier round.
+    
+    A pattern whose predicate is a property path may match through a mix of
+    old and new triples, so rules containing one are evaluated in full.
+    
+    Args:
+        rule: Rule to evaluate
+        graph: RDF graph to evaluate against, including delta
+        delta: Triples added to graph since the previous round
+        active_graph: Optional active graph for dataset queries
+        
+    Returns:
+        List of solution mappings using at least one triple from delta
+    """
+    elements = rule.body.elements
+    positions = [i for i, element in enumerate(elements) if isinstance(element, TriplePattern)]
+    if active_graph is not None or any(
+        isinstance(elements[i].predicate, (InversePath, PathSequence)) for i in positions
+    ):
+        return eval_rule(rule, graph, active_graph)
+    
+    result: List[SolutionMapping] = []
+    for i in positions:
+        # Joins commute, so when only triple patterns precede the delta
+        # pattern it is matched first to keep intermediate results small
+        if all(isinstance(element, TriplePattern) for element in elements[:i]):
+            order = [i, *range(i), *range(i + 1, len(elements))]
+        else:
+            order = range(len(elements))
+        
+        omega: List[SolutionMapping] = [SolutionMapping(bindings={})]
+        for j in order:
+            omega = eval_body_element(elements[j], omega, delta if j == i else graph)
+            if not omega:
+                break
+        result.extend(omega)
+    
+    return result
+
+
 def eval_body_element(
     element: RuleBodyElement,
     omega: List[SolutionMapping],
@@ -122,13 +180,9 @@ def eval_triple_pattern(
     Returns:
         Joined solution mappings
     """
-    # Get all matches for this triple pattern
-    matches = graphMatch(graph, pattern, active_graph)
-    
-    # Join with current solution mappings
-    result = join(omega, matches)
-    
-    return result
+    # Join with current solution mappings, probing the graph per mapping
+    # where that is cheaper than matching the whole pattern
+    return join_pattern(omega, pattern, graph, active_graph)
 
 
 def eval_filter(
@@ -155,11 +209,19 @@ def eval_filter(
     Returns:
         Filtered solution mappings
     """
+    # Comparisons of a variable with a numeric constant skip the generic
+    # expression evaluator
+    test = numeric_comparison_filter(filter_expr.expression)
+    if test is not None:
+        return [mu for mu in omega if test(mu)]
+    
+    # Compile once rather than walking the expression for every mapping
+    evaluate = compile_expr(filter_expr.expression, active_graph)
     result = []
     
     for mu in omega:
         # Evaluate the filter expression
-        value = eval_expr(filter_expr.expression, mu, active_graph)
+        value = evaluate(mu)
         
         # Keep mapping if effective boolean value is true
         if effective_boolean_value(value):
@@ -239,11 +301,12 @@ def eval_assignment(
     Returns:
         Extended solution mappings
     """
+    evaluate = compile_expr(assignment.expression, active_graph)
     result = []
     
     for mu in omega:
         # Evaluate the expression
-        value = eval_expr(assignment.expression, mu, active_graph)
+        value = evaluate(mu)
         
         # Skip if expression evaluation failed
         if value is None:
@@ -279,10 +342,305 @@ def eval_rule_body(
         Solution mappings from body evaluation
     """
     # Create a temporary rule for evaluation
-    from ..ast.nodes import Rule, RuleHead
     temp_rule = Rule(
         head=RuleHead(templates=[]),
         body=body
     )
     
     return eval_rule(temp_rule, graph, active_graph)
+
+
+def transitive_rule_predicate(rule: Rule) -> Optional[IRI]:
+    """
+    Recognise a rule stating that a predicate is transitive.
+    
+    Returns p if the rule is { ?x p ?z } WHERE { ?x p ?y . ?y p ?z } for
+    distinct variables (the body patterns in either order), otherwise None.
+    """
+    templates = rule.head.templates
+    elements = rule.body.elements
+    if len(templates) != 1 or len(elements) != 2:
+        return None
+    if not all(type(element) is TriplePattern for element in elements):
+        return None
+    
+    head = templates[0]
+    first, second = elements
+    if first.subject != head.subject:
+        first, second = second, first
+    predicate = head.predicate
+    if type(predicate) is not IRI or not first.predicate == second.predicate == predicate:
+        return None
+    x, y, z = head.subject, first.object, head.object
+    if not all(type(term) is Variable for term in (x, y, z)) or len({x, y, z}) != 3:
+        return None
+    if first.subject != x or second.subject != y or second.object != z:
+        return None
+    return predicate
+
+
+def eval_transitive_closure(
+    graph: Graph,
+    predicate: URIRef,
+    delta: Optional[Graph] = None
+) -> Set[Tuple[Node, Node]]:
+    """
+    Pairs (x, z) joined by a chain of predicate edges in graph.
+    
+    Each node's reachable set is found by a search that stops at any node
+    whose reachable set is already known and takes that set whole, so the
+    closure is computed in one pass instead of one hop per fixpoint round.
+    
+    With delta, only chains through a new edge are needed. They start at a
+    node that reaches the subject of a new edge, so only those nodes are
+    searched.
+    
+    Without delta, small closures are computed on bitsets instead.
+    
+    Args:
+        graph: RDF graph, including delta
+        predicate: Transitive predicate
+        delta: Triples added to graph since the previous round
+        
+    Returns:
+        Set of (subject, object) pairs
+    """
+    if delta is None:
+        edges = list(graph.subject_objects(predicate))
+        pairs = _bitset_closure(edges)
+        if pairs is not None:
+            return pairs
+        sources = {subject for subject, _ in edges}
+    else:
+        sources = set(delta.subjects(predicate, None))
+        frontier = list(sources)
+        while frontier:
+            node = frontier.pop()
+            for previous in graph.subjects(predicate, node):
+                if previous not in sources:
+                    sources.add(previous)
+                    frontier.append(previous)
+    
+    closures: Dict[Node, Set[Node]] = {}
+    pairs: Set[Tuple[Node, Node]] = set()
+    for source in sources:
+        reached: Set[Node] = set()
+        frontier = [source]
+        while frontier:
+            node = frontier.pop()
+            for successor in graph.objects(node, predicate):
+                if successor in reached:
+                    continue
+                reached.add(successor)
+                known = closures.get(successor)
+                if known is None:
+                    frontier.append(successor)
+                else:
+                    reached |= known
+        closures[source] = reached
+        pairs.update((source, node) for node in reached)
+    
+    return pairs
+
+
+def _bitset_closure(
+    edges: List[Tuple[Node, Node]]
+) -> Optional[Set[Tuple[Node, Node]]]:
+    """
+    Transitive closure of edges, with reachable sets as int bitsets.
+    
+    Tarjan's algorithm yields strongly connected components successors
+    first, so a component reaches the union of its successors and what
+    they reach, plus its own members if it contains a cycle. Each union is
+    a single OR of two ints.
+    
+    Returns:
+        Set of (subject, object) pairs, or None if there are too many nodes
+    """
+    index: Dict[Node, int] = {}
+    nodes: List[Node] = []
+    successors: List[List[int]] = []
+    for edge in edges:
+        for term in edge:
+            if term not in index:
+                index[term] = len(nodes)
+                nodes.append(term)
+                successors.append([])
+        successors[index[edge[0]]].append(index[edge[1]])
+    if len(nodes) >= _BITSET_CLOSURE_LIMIT:
+        return None
+    
+    n = len(nodes)
+    discovered = [0] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    component = [-1] * n
+    # Nodes reachable from each component, in the order they complete
+    reach: List[int] = []
+    counter = 0
+    for root in range(n):
+        if discovered[root]:
+            continue
+        counter += 1
+        discovered[root] = low[root] = counter
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(successors[root]))]
+        while work:
+            v, pending = work[-1]
+            for w in pending:
+                if not discovered[w]:
+                    counter += 1
+                    discovered[w] = low[w] = counter
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, iter(successors[w])))
+                    break
+                if on_stack[w] and discovered[w] < low[v]:
+                    low[v] = discovered[w]
+            else:
+                work.pop()
+                if work and low[v] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[v]
+                if low[v] != discovered[v]:
+                    continue
+                
+                c = len(reach)
+                members: List[int] = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component[w] = c
+                    members.append(w)
+                    if w == v:
+                        break
+                
+                bits = 0
+                cyclic = len(members) > 1
+                for w in members:
+                    for x in successors[w]:
+                        if component[x] == c:
+                            cyclic = True
+                        else:
+                            bits |= reach[component[x]] | (1 << x)
+                if cyclic:
+                    for w in members:
+                        bits |= 1 << w
+                reach.append(bits)
+    
+    targets: Dict[int, List[Node]] = {}
+    pairs: Set[Tuple[Node, Node]] = set()
+    for v, node in enumerate(nodes):
+        c = component[v]
+        reached = targets.get(c)
+        if reached is None:
+            # Read the set bits from the binary digits, lowest first
+            digits = bin(reach[c])[:1:-1]
+            reached = targets[c] = [nodes[i] for i, digit in enumerate(digits) if digit == "1"]
+        pairs.update((node, target) for target in reached)
+    
+    return pairs
+
+
+def order_body_elements(
+    elements: List[RuleBodyElement],
+    graph: Graph
+) -> List[RuleBodyElement]:
+    """
+    Reorder a rule body for evaluation against a graph.
+    
+    Each run of consecutive triple patterns is ordered by estimated
+    cardinality, preferring at each step a pattern that shares a variable
+    with those already placed so the joins avoid cross products. Joins
+    commute, so this does not change the solutions.
+    
+    Each FILTER is then moved up to just after the element that binds the
+    last of its variables, pruning mappings before the joins that follow.
+    Filters only remove mappings and never see a binding change, so they
+    commute with the elements they move past. BIND and NOT keep their
+    positions relative to the runs.
+    
+    Args:
+        elements: Rule body elements in source order
+        graph: RDF graph the rule will be evaluated against
+        
+    Returns:
+        Reordered body elements
+    """
+    ordered: List[RuleBodyElement] = []
+    run: List[TriplePattern] = []
+    for element in elements:
+        if isinstance(element, TriplePattern):
+            run.append(element)
+            continue
+        ordered.extend(_order_patterns(run, graph))
+        run = []
+        ordered.append(element)
+    ordered.extend(_order_patterns(run, graph))
+    
+    result: List[RuleBodyElement] = []
+    # bound[k]: variables certainly bound after result[k]
+    bound: List[Set[str]] = []
+    for element in ordered:
+        variables = _filter_variables(element)
+        if variables is not None and bound and variables <= bound[-1]:
+            position = next(k for k, names in enumerate(bound) if variables <= names) + 1
+            result.insert(position, element)
+            bound.insert(position, bound[position - 1])
+            continue
+        names = set(bound[-1]) if bound else set()
+        if isinstance(element, TriplePattern):
+            names.update(_pattern_variables(element))
+        elif isinstance(element, Assignment):
+            names.add(element.variable.name)
+        result.append(element)
+        bound.append(names)
+    
+    return result
+
+
+def _order_patterns(patterns: List[TriplePattern], graph: Graph) -> List[TriplePattern]:
+    """Order a run of triple patterns by estimated cardinality, keeping joins connected."""
+    if len(patterns) < 2:
+        return patterns
+    
+    remaining = sorted(patterns, key=lambda pattern: estimate_cardinality(graph, pattern))
+    ordered: List[TriplePattern] = []
+    seen: Set[str] = set()
+    while remaining:
+        pick = next((p for p in remaining if seen & _pattern_variables(p)), remaining[0])
+        remaining.remove(pick)
+        ordered.append(pick)
+        seen |= _pattern_variables(pick)
+    return ordered
+
+
+def _pattern_variables(pattern: TriplePattern) -> Set[str]:
+    return {
+        term.name
+        for term in (pattern.subject, pattern.predicate, pattern.object)
+        if isinstance(term, Variable)
+    }
+
+
+def _filter_variables(element: RuleBodyElement) -> Optional[Set[str]]:
+    """
+    Variables mentioned by a FILTER, or None if element is not a filter that
+    can be moved (not a filter, mentions no variables, or contains EXISTS).
+    """
+    if not isinstance(element, ConditionExpression):
+        return None
+    names: Set[str] = set()
+    stack = [element.expression]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Variable):
+            names.add(node.name)
+        elif isinstance(node, ExistsExpression):
+            return None
+        elif isinstance(node, list):
+            stack.extend(node)
+        else:
+            stack.extend(getattr(node, name) for name in getattr(type(node), "_fields", ()))
+    return names or None
@@ -5,11 +5,21 @@ Implements Section 5.1 of the specification: solution mappings,
 substitution, compatibility, merging, and graph matching.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, Set, List, Optional, Union
+from functools import lru_cache
+from typing import (
+    Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+)
 
 from rdflib import Graph, URIRef, Literal as RDFLiteral, BNode
 
+try:
+    from pyrsistent import PMap, pmap
+except ImportError:
+    # Optional: persistent maps let extend() share structure with its parent
+    PMap = pmap = None
+
 from ..ast.nodes import (
     Variable,
     IRI,
@@ -20,6 +30,7 @@ from ..ast.nodes import (
     InversePath,
     PathSequence,
 )
+from ..rdf.nodes import _uriref
 
 # Type aliases for RDF terms
 RDFTerm = Union[URIRef, RDFLiteral, BNode]
@@ -75,10 +86,14 @@ def compatible(mu1: SolutionMapping, mu2: SolutionMapping) -> bool:
     Returns:
         True if mappings are compatible, False otherwise
     """
-    common_vars = mu1.domain() & mu2.domain()
-
-    for var in common_vars:
-        if mu1[var] != mu2[var]:
+    if mu1 is mu2 or mu1.bindings is mu2.bindings:
+        return True
+
+    d1, d2 = mu1.bindings, mu2.bindings
+    for var in d1.keys() & d2.keys():
+        # Terms are mostly shared instances; identity skips rdflib's __eq__
+        v1, v2 = d1[var], d2[var]
+        if v1 is not v2 and v1 != v2:
             return False
 
     return True
@@ -102,7 +117,11 @@ def merge(mu1: SolutionMapping, mu2: SolutionMapping) -> Optional[SolutionMappin
     """
     if not compatible(mu1, mu2):
         return None
+    if mu1.bindings is mu2.bindings:
+        return mu1
 
+    if PMap is not None and isinstance(mu1.bindings, PMap):
+        return SolutionMapping(bindings=mu1.bindings.update(mu2.bindings))
     merged_bindings = {**mu1.bindings, **mu2.bindings}
     return SolutionMapping(bindings=merged_bindings)
 
@@ -123,30 +142,10 @@ def substitute_term(term: Union[Variable, IRI, Literal, BlankNode], mu: Solution
     Returns:
         Substituted RDF term
     """
-    if isinstance(term, Variable):
-        if term.name in mu:
-            return mu[term.name]
-        else:
-            # Variable not bound - in evaluation context this is typically an error
-            raise ValueError(f"Variable {term.name} not bound in solution mapping")
-    elif isinstance(term, IRI):
-        return URIRef(term.value)
-    elif isinstance(term, Literal):
-        if term.datatype:
-            dt = URIRef(term.datatype.value) if isinstance(term.datatype, IRI) else None
-            return RDFLiteral(term.value, datatype=dt)
-        elif term.language:
-            return RDFLiteral(term.value, lang=term.language)
-        else:
-            return RDFLiteral(term.value)
-    elif isinstance(term, BlankNode):
-        return BNode(term.label) if term.label else BNode()
-    elif isinstance(term, (InversePath, PathSequence)):
-        # Property paths are handled specially in graph matching, not substitution
-        # Return as-is for path evaluation
-        return term
-    else:
+    handler = _SUBST_HANDLERS.get(type(term))
+    if handler is None:
         raise TypeError(f"Unknown term type: {type(term)}")
+    return handler(term, mu)
 
 
 def substitute_term_safe(term: Union[Variable, IRI, Literal, BlankNode], mu: SolutionMapping) -> Optional[RDFTerm]:
@@ -177,34 +176,9 @@ def graphMatch(graph: Graph, pattern: TriplePattern, active_graph: Optional[Grap
     Returns:
         List of solution mappings
     """
-    solutions: List[SolutionMapping] = []
-
-    # Convert pattern terms to RDF nodes or keep as variables
-    def pattern_term(term):
-        """Convert AST term to RDF term or None (for variables)."""
-        if isinstance(term, Variable):
-            return None  # Will match any term
-        elif isinstance(term, IRI):
-            return URIRef(term.value)
-        elif isinstance(term, Literal):
-            if term.datatype:
-                dt = URIRef(term.datatype.value) if isinstance(term.datatype, IRI) else None
-                return RDFLiteral(term.value, datatype=dt)
-            elif term.language:
-                return RDFLiteral(term.value, lang=term.language)
-            else:
-                return RDFLiteral(term.value)
-        elif isinstance(term, BlankNode):
-            return BNode(term.label) if term.label else BNode()
-        elif isinstance(term, (InversePath, PathSequence)):
-            # Property paths need special evaluation
-            return term
-        else:
-            raise TypeError(f"Unknown term type: {type(term)}")
-
-    subj = pattern_term(pattern.subject)
-    pred = pattern_term(pattern.predicate)
-    obj = pattern_term(pattern.object)
+    subj = _pattern_term(pattern.subject)
+    pred = _pattern_term(pattern.predicate)
+    obj = _pattern_term(pattern.object)
 
     # Check if predicate is a property path
     if isinstance(pred, (InversePath, PathSequence)):
@@ -213,24 +187,17 @@ def graphMatch(graph: Graph, pattern: TriplePattern, active_graph: Optional[Grap
     # Query the graph
     target_graph = active_graph if active_graph is not None else graph
 
-    for s, p, o in target_graph.triples((subj, pred, obj)):
-        bindings = {}
-
-        # Bind subject if it's a variable
-        if isinstance(pattern.subject, Variable):
-            bindings[pattern.subject.name] = s
-
-        # Bind predicate if it's a variable
-        if isinstance(pattern.predicate, Variable):
-            bindings[pattern.predicate.name] = p
-
-        # Bind object if it's a variable
-        if isinstance(pattern.object, Variable):
-            bindings[pattern.object.name] = o
+    # Positions of the pattern that are variables, paired with their names
+    var_positions = tuple(
+        (i, term.name)
+        for i, term in enumerate((pattern.subject, pattern.predicate, pattern.object))
+        if isinstance(term, Variable)
+    )
 
-        solutions.append(SolutionMapping(bindings=bindings))
-
-    return solutions
+    return [
+        SolutionMapping(bindings={name: spo[i] for i, name in var_positions})
+        for spo in target_graph.triples((subj, pred, obj))
+    ]
 
 
 def graphMatchWithPath(
@@ -256,103 +223,314 @@ def graphMatchWithPath(
     target_graph = active_graph if active_graph is not None else graph
     solutions: List[SolutionMapping] = []
 
-    # Get all (start, end) pairs that satisfy the path
-    path_results = evaluate_path(target_graph, path)
+    # Constant endpoints are converted once; variables map to None
+    subj_term = _pattern_term(subject_pattern)
+    obj_term = _pattern_term(object_pattern)
+
+    # Seed the traversal from a bound endpoint where possible; a bound object
+    # is handled by walking the inverse path and swapping the pairs back.
+    if subj_term is not None:
+        path_results = evaluate_path(target_graph, path, [subj_term])
+    elif obj_term is not None:
+        inverse_results = evaluate_path(target_graph, InversePath(path=path), [obj_term])
+        path_results = {(start, end) for end, start in inverse_results}
+    else:
+        path_results = evaluate_path(target_graph, path)
 
     for start_node, end_node in path_results:
         bindings = {}
 
         # Check if subject matches
-        if isinstance(subject_pattern, Variable):
+        if subj_term is None:
             bindings[subject_pattern.name] = start_node
-        else:
-            # Subject is a constant - check if it matches
-            subj_term = _ast_to_rdf(subject_pattern)
-            if subj_term != start_node:
-                continue
+        elif subj_term != start_node:
+            continue
 
         # Check if object matches
-        if isinstance(object_pattern, Variable):
+        if obj_term is None:
             bindings[object_pattern.name] = end_node
-        else:
-            # Object is a constant - check if it matches
-            obj_term = _ast_to_rdf(object_pattern)
-            if obj_term != end_node:
-                continue
+        elif obj_term != end_node:
+            continue
 
         solutions.append(SolutionMapping(bindings=bindings))
 
     return solutions
 
 
-def _ast_to_rdf(term) -> Optional[RDFTerm]:
-    """Convert AST term to RDF term."""
-    if isinstance(term, IRI):
-        return URIRef(term.value)
-    elif isinstance(term, Literal):
-        if term.datatype:
-            dt = URIRef(term.datatype.value) if isinstance(term.datatype, IRI) else None
-            return RDFLiteral(term.value, datatype=dt)
-        elif term.language:
-            return RDFLiteral(term.value, lang=term.language)
+def _subst_var(term: Variable, mu: SolutionMapping) -> RDFTerm:
+    if term.name in mu.bindings:
+        return mu.bindings[term.name]
+    # Variable not bound - in evaluation context this is typically an error
+    raise ValueError(f"Variable {term.name} not bound in solution mapping")
+
+
+def _iri_to_rdf(term: IRI, mu: Optional[SolutionMapping] = None) -> URIRef:
+    return _uriref(term.value)
+
+
+def _literal_to_rdf(term: Literal, mu: Optional[SolutionMapping] = None) -> RDFLiteral:
+    return _rdf_literal(term)
+
+
+@lru_cache(maxsize=8192)
+def _rdf_literal(term: Literal) -> RDFLiteral:
+    """Shared rdflib Literal for an AST literal, see _uriref."""
+    if term.datatype:
+        dt = _uriref(term.datatype.value) if isinstance(term.datatype, IRI) else None
+        return RDFLiteral(term.value, datatype=dt)
+    elif term.language:
+        return RDFLiteral(term.value, lang=term.language)
+    else:
+        return RDFLiteral(term.value)
+
+
+def _bnode_to_rdf(term: BlankNode, mu: Optional[SolutionMapping] = None) -> BNode:
+    return BNode(term.label) if term.label else BNode()
+
+
+def _pass_path(term, mu: Optional[SolutionMapping] = None):
+    # Property paths are handled specially in graph matching, not substitution
+    return term
+
+
+def _unbound(term: Variable, mu: Optional[SolutionMapping] = None) -> None:
+    return None  # Will match any term
+
+
+# Dispatch on the exact AST node type; the node classes are engine-internal
+# and not meant to be subclassed.
+_SUBST_HANDLERS = {
+    Variable: _subst_var,
+    IRI: _iri_to_rdf,
+    Literal: _literal_to_rdf,
+    BlankNode: _bnode_to_rdf,
+    InversePath: _pass_path,
+    PathSequence: _pass_path,
+}
+
+_PATTERN_HANDLERS = {**_SUBST_HANDLERS, Variable: _unbound}
+
+
+def _pattern_term(term):
+    """Convert AST term to RDF term or None (for variables)."""
+    handler = _PATTERN_HANDLERS.get(type(term))
+    if handler is None:
+        raise TypeError(f"Unknown term type: {type(term)}")
+    return handler(term)
+
+
+class PathNFA(NamedTuple):
+    """
+    Non-deterministic finite automaton compiled from a property path.
+
+    Each transition is a ``(predicate, inverse, target_state)`` triple: from
+    a node ``n`` in the source state, the automaton moves to every ``o`` with
+    ``(n, predicate, o)`` in the graph (or every ``s`` with ``(s, predicate, n)``
+    when ``inverse`` is set).
+    """
+
+    states: int
+    start: int
+    finals: FrozenSet[int]
+    transitions: Dict[int, List[Tuple[URIRef, bool, int]]]
+
+
+def compile_path_to_nfa(path) -> PathNFA:
+    """
+    Compile a property path into a Thompson-style NFA.
+
+    Sequences chain their element automata, and an inverse path compiles its
+    inner path with every edge direction flipped (and sequences reversed).
+
+    Args:
+        path: Property path (IRI, InversePath, PathSequence)
+
+    Returns:
+        The compiled automaton
+    """
+    transitions: Dict[int, List[Tuple[URIRef, bool, int]]] = {0: []}
+
+    def new_state() -> int:
+        state = len(transitions)
+        transitions[state] = []
+        return state
+
+    def compile_from(node, start: int, inverse: bool) -> Optional[int]:
+        if isinstance(node, IRI):
+            end = new_state()
+            transitions[start].append((URIRef(node.value), inverse, end))
+            return end
+        elif isinstance(node, InversePath):
+            return compile_from(node.path, start, not inverse)
+        elif isinstance(node, PathSequence):
+            if not node.elements:
+                return None
+            elements = reversed(node.elements) if inverse else node.elements
+            current: Optional[int] = start
+            for element in elements:
+                current = compile_from(element, current, inverse)
+                if current is None:
+                    return None
+            return current
         else:
-            return RDFLiteral(term.value)
-    elif isinstance(term, BlankNode):
-        return BNode(term.label) if term.label else BNode()
-    return None
+            raise TypeError(f"Unknown path type: {type(node)}")
+
+    final = compile_from(path, 0, False)
+    finals = frozenset() if final is None else frozenset({final})
+    return PathNFA(states=len(transitions), start=0, finals=finals, transitions=transitions)
+
+
+# Compiled automata keyed by path structure. graphMatchWithPath builds fresh
+# InversePath wrappers per call, so AST identity would rarely hit.
+_NFA_CACHE: Dict[tuple, PathNFA] = {}
+_NFA_CACHE_SIZE = 1024
 
 
-def evaluate_path(graph: Graph, path) -> Set[tuple]:
+def _path_key(path) -> tuple:
+    """Return a hashable structural key for a property path."""
+    if isinstance(path, IRI):
+        return ("iri", path.value)
+    elif isinstance(path, InversePath):
+        return ("inv", _path_key(path.path))
+    elif isinstance(path, PathSequence):
+        return ("seq",) + tuple(_path_key(element) for element in path.elements)
+    else:
+        raise TypeError(f"Unknown path type: {type(path)}")
+
+
+def _compiled_nfa(path) -> PathNFA:
+    """Compile a path to an NFA, reusing earlier compilations of the same path."""
+    key = _path_key(path)
+    nfa = _NFA_CACHE.get(key)
+    if nfa is None:
+        if len(_NFA_CACHE) >= _NFA_CACHE_SIZE:
+            _NFA_CACHE.clear()
+        nfa = _NFA_CACHE[key] = compile_path_to_nfa(path)
+    return nfa
+
+
+def evaluate_path(graph: Graph, path, start_nodes: Optional[Iterable[RDFTerm]] = None) -> Set[tuple]:
     """
     Evaluate a property path and return all (start, end) pairs.
 
+    The path is compiled to an NFA and evaluated by breadth-first search over
+    the product of the graph and the automaton, so each (node, state) pair is
+    visited at most once per starting node.
+
     Args:
         graph: RDF graph
         path: Property path to evaluate
+        start_nodes: Optional nodes to seed the search from; if omitted, every
+            node with an edge leaving the start state is used
 
     Returns:
         Set of (start_node, end_node) pairs that satisfy the path
     """
-    if isinstance(path, IRI):
-        # Simple predicate path
-        pred = URIRef(path.value)
-        return {(s, o) for s, p, o in graph.triples((None, pred, None))}
-
-    elif isinstance(path, InversePath):
-        # Inverse path: ^p means follow p backwards
-        inner_results = evaluate_path(graph, path.path)
-        return {(end, start) for start, end in inner_results}
+    if start_nodes is None and isinstance(path, PathSequence) and len(path.elements) > 1:
+        rarest = _rarest_element(path.elements, graph)
+        if rarest > 0:
+            return _evaluate_sequence_outward(graph, path, rarest)
+
+    nfa = _compiled_nfa(path)
+    if not nfa.finals:
+        return set()
+
+    if start_nodes is None:
+        seeds: Set[RDFTerm] = set()
+        for pred, inverse, _ in nfa.transitions[nfa.start]:
+            if inverse:
+                seeds.update(graph.objects(None, pred))
+            else:
+                seeds.update(graph.subjects(pred, None))
+    else:
+        seeds = set(start_nodes)
+
+    results = set()
+    for seed in seeds:
+        visited = {(seed, nfa.start)}
+        queue = deque(visited)
+        while queue:
+            node, state = queue.popleft()
+            if state in nfa.finals:
+                results.add((seed, node))
+            for pred, inverse, target in nfa.transitions[state]:
+                if inverse:
+                    neighbours = graph.subjects(pred, node)
+                else:
+                    neighbours = graph.objects(node, pred)
+                for neighbour in neighbours:
+                    step = (neighbour, target)
+                    if step not in visited:
+                        visited.add(step)
+                        queue.append(step)
+
+    return results
+
+
+def _rarest_element(elements, graph: Graph) -> int:
+    """
+    Index of the sequence element producing the fewest (start, end) pairs.
 
-    elif isinstance(path, PathSequence):
-        # Sequence path: p1/p2 means follow p1 then p2
-        if not path.elements:
-            return set()
+    The elements' matches are counted in lockstep and the first to run out
+    is the rarest, so the work is bounded by the rarest element's count
+    times the number of elements rather than by the most common one.
+    """
+    matches = [_step_matches(element, graph) for element in elements]
+    while True:
+        for i, items in enumerate(matches):
+            if next(items, None) is None:
+                return i
 
-        # Start with first path element
-        current_results = evaluate_path(graph, path.elements[0])
 
-        # Chain through remaining elements
-        for element in path.elements[1:]:
-            next_step = evaluate_path(graph, element)
-            # Join: for each (a, b) in current and (b, c) in next_step, produce (a, c)
-            new_results = set()
-            next_step_dict = {}
-            for start, end in next_step:
-                if start not in next_step_dict:
-                    next_step_dict[start] = []
-                next_step_dict[start].append(end)
+def _step_matches(path, graph: Graph) -> Iterator:
+    """
+    Iterate one item per estimated (start, end) pair of a path step.
 
-            for start, mid in current_results:
-                if mid in next_step_dict:
-                    for end in next_step_dict[mid]:
-                        new_results.add((start, end))
+    Plain predicates yield their triples; inverse paths yield as many as
+    their inner path and sequences as many as their rarest element.
+    """
+    if isinstance(path, IRI):
+        return graph.triples((None, URIRef(path.value), None))
+    elif isinstance(path, InversePath):
+        return _step_matches(path.path, graph)
+    elif isinstance(path, PathSequence):
+        return zip(*(_step_matches(element, graph) for element in path.elements))
+    raise TypeError(f"Unknown path type: {type(path)}")
 
-            current_results = new_results
 
-        return current_results
+def _evaluate_sequence_outward(graph: Graph, path: PathSequence, pivot: int) -> Set[tuple]:
+    """
+    Evaluate a sequence path starting from its element at position ``pivot``.
 
+    The pivot element is evaluated first; the prefix is then walked backwards
+    (as an inverse path) from each pivot start node and the suffix forwards
+    from each pivot end node, and the three parts are joined at the pivot.
+    """
+    pivot_pairs = evaluate_path(graph, path.elements[pivot])
+    if not pivot_pairs:
+        return set()
+
+    prefix = InversePath(path=PathSequence(elements=path.elements[:pivot]))
+    prefix_pairs = evaluate_path(graph, prefix, {start for start, _ in pivot_pairs})
+    starts_by_mid: Dict[RDFTerm, List[RDFTerm]] = {}
+    for mid, start in prefix_pairs:
+        starts_by_mid.setdefault(mid, []).append(start)
+
+    suffix_elements = path.elements[pivot + 1:]
+    if suffix_elements:
+        suffix_pairs = evaluate_path(graph, PathSequence(elements=suffix_elements), {end for _, end in pivot_pairs})
+        ends_by_mid: Dict[RDFTerm, List[RDFTerm]] = {}
+        for mid, end in suffix_pairs:
+            ends_by_mid.setdefault(mid, []).append(end)
     else:
-        raise TypeError(f"Unknown path type: {type(path)}")
+        ends_by_mid = {end: [end] for _, end in pivot_pairs}
+
+    results = set()
+    for left, right in pivot_pairs:
+        for start in starts_by_mid.get(left, ()):
+            for end in ends_by_mid.get(right, ()):
+                results.add((start, end))
+    return results
 
 
 def substitute_triple_template(
@@ -381,6 +559,11 @@ def substitute_triple_template(
         return None
 
 
+def _distinct(omega: List[SolutionMapping]) -> List[SolutionMapping]:
+    """Remove duplicate solution mappings, keeping first-seen order."""
+    return list({frozenset(mu.bindings.items()): mu for mu in omega}.values())
+
+
 def join(omega1: List[SolutionMapping], omega2: List[SolutionMapping]) -> List[SolutionMapping]:
     """
     Join two sets of solution mappings.
@@ -395,10 +578,33 @@ def join(omega1: List[SolutionMapping], omega2: List[SolutionMapping]) -> List[S
     Returns:
         List of joined solution mappings
     """
+    omega1 = _distinct(omega1)
+    omega2 = _distinct(omega2)
     result = []
 
+    if not omega1 or not omega2:
+        return result
+
+    # Hash join: bucket Ω₂ by the variables bound in every mapping on both
+    # sides, so each μ₁ is only merged with the μ₂ that agree on them.
+    shared = _common_domain(omega1) & _common_domain(omega2)
+    if not shared:
+        for mu1 in omega1:
+            for mu2 in omega2:
+                merged = merge(mu1, mu2)
+                if merged is not None:
+                    result.append(merged)
+        return result
+
+    key_vars = tuple(sorted(shared))
+    buckets: Dict[tuple, List[SolutionMapping]] = {}
+    for mu2 in omega2:
+        key = tuple(mu2.bindings[v] for v in key_vars)
+        buckets.setdefault(key, []).append(mu2)
+
     for mu1 in omega1:
-        for mu2 in omega2:
+        key = tuple(mu1.bindings[v] for v in key_vars)
+        for mu2 in buckets.get(key, ()):
             merged = merge(mu1, mu2)
             if merged is not None:
                 result.append(merged)
@@ -406,6 +612,110 @@ def join(omega1: List[SolutionMapping], omega2: List[SolutionMapping]) -> List[S
     return result
 
 
+def join_pattern(
+    omega: List[SolutionMapping],
+    pattern: TriplePattern,
+    graph: Graph,
+    active_graph: Optional[Graph] = None,
+) -> List[SolutionMapping]:
+    """
+    Compute join(Ω, graphMatch(G, tp)) for a triple pattern.
+
+    When every mapping in Ω binds a variable of tp and the graph holds more
+    triples matching tp's constants than there are mappings, each mapping's
+    bindings are substituted into tp and the graph's own indexes are probed
+    (an index nested-loop join). Otherwise tp is matched once and hash-joined.
+
+    Args:
+        omega: Current solution mappings
+        pattern: Triple pattern to match
+        graph: RDF graph to match against
+        active_graph: Optional active graph for dataset queries
+
+    Returns:
+        List of joined solution mappings
+    """
+    terms = (pattern.subject, pattern.predicate, pattern.object)
+    var_positions = tuple(
+        (i, term.name) for i, term in enumerate(terms) if isinstance(term, Variable)
+    )
+    var_names = {name for _, name in var_positions}
+    if (
+        not omega
+        or isinstance(pattern.predicate, (InversePath, PathSequence))
+        # Repeated variables are left to graphMatch
+        or len(var_names) != len(var_positions)
+    ):
+        return join(omega, graphMatch(graph, pattern, active_graph))
+
+    omega = _distinct(omega)
+    bound = var_names & _common_domain(omega)
+    target_graph = active_graph if active_graph is not None else graph
+    query = tuple(_pattern_term(term) for term in terms)
+    if not bound or _count_at_most(target_graph.triples(query), len(omega)) <= len(omega):
+        return join(omega, graphMatch(graph, pattern, active_graph))
+
+    result = []
+    for mu in omega:
+        # Substitute every variable this mapping binds, not just the common
+        # ones, so the extension never conflicts with the mapping
+        bindings = mu.bindings
+        probe = list(query)
+        free_positions = []
+        for i, name in var_positions:
+            value = bindings.get(name)
+            if value is None:
+                free_positions.append((i, name))
+            else:
+                probe[i] = value
+        for spo in target_graph.triples(tuple(probe)):
+            extension = {name: spo[i] for i, name in free_positions}
+            result.append(merge(mu, SolutionMapping(bindings=extension)) if extension else mu)
+    return result
+
+
+# Patterns matching more triples than this are ranked as equally unselective
+_CARDINALITY_LIMIT = 10000
+
+
+def estimate_cardinality(graph: Graph, pattern: TriplePattern) -> int:
+    """
+    Estimate how many solutions graphMatch(G, tp) yields.
+
+    Counts the triples matching tp's constant positions, stopping just past
+    _CARDINALITY_LIMIT; a property path predicate is estimated as the size of
+    the whole graph.
+    """
+    if isinstance(pattern.predicate, (InversePath, PathSequence)):
+        return len(graph)
+    query = (
+        _pattern_term(pattern.subject),
+        _pattern_term(pattern.predicate),
+        _pattern_term(pattern.object),
+    )
+    return _count_at_most(graph.triples(query), _CARDINALITY_LIMIT)
+
+
+def _count_at_most(items: Iterable, limit: int) -> int:
+    """Count items, stopping once the count exceeds limit."""
+    count = 0
+    for _ in items:
+        count += 1
+        if count > limit:
+            break
+    return count
+
+
+def _common_domain(omega: List[SolutionMapping]) -> Set[str]:
+    """Return the variables bound in every mapping of a non-empty list."""
+    common = set(omega[0].bindings)
+    for mu in omega[1:]:
+        common.intersection_update(mu.bindings)
+        if not common:
+            break
+    return common
+
+
 def minus(omega1: List[SolutionMapping], omega2: List[SolutionMapping]) -> List[SolutionMapping]:
     """
     Set difference for solution mappings (for NOT EXISTS / negation).
@@ -420,18 +730,36 @@ def minus(omega1: List[SolutionMapping], omega2: List[SolutionMapping]) -> List[
     Returns:
         List of solution mappings from omega1 not compatible with any in omega2
     """
-    result = []
+    omega1 = _distinct(omega1)
+    omega2 = _distinct(omega2)
+    if not omega2:
+        return omega1
+
+    # Index Ω₂ by variable: rows binding v to each term, and rows leaving v
+    # unbound (those stay compatible with any value of v).
+    all_rows = frozenset(range(len(omega2)))
+    index: Dict[str, Dict[RDFTerm, Set[int]]] = {}
+    for i, mu2 in enumerate(omega2):
+        for var, value in mu2.bindings.items():
+            index.setdefault(var, {}).setdefault(value, set()).add(i)
+    unbound: Dict[str, FrozenSet[int]] = {
+        var: all_rows - frozenset().union(*by_value.values())
+        for var, by_value in index.items()
+    }
 
+    result = []
     for mu1 in omega1:
-        # Check if mu1 is compatible with any mapping in omega2
-        is_compatible_with_any = False
-        for mu2 in omega2:
-            if compatible(mu1, mu2):
-                is_compatible_with_any = True
+        # Only include mu1 if it is NOT compatible with any mapping in omega2
+        candidates: Optional[Set[int]] = None
+        for var, value in mu1.bindings.items():
+            by_value = index.get(var)
+            if by_value is None:
+                continue
+            rows = by_value.get(value, set()) | unbound[var]
+            candidates = rows if candidates is None else candidates & rows
+            if not candidates:
                 break
-
-        # Only include if NOT compatible with any
-        if not is_compatible_with_any:
+        if candidates is not None and not candidates:
             result.append(mu1)
 
     return result
@@ -451,5 +779,9 @@ def extend(mu: SolutionMapping, var: Variable, value: RDFTerm) -> SolutionMappin
     Returns:
         New solution mapping with additional binding
     """
+    if pmap is not None:
+        # Chains of BINDs share structure instead of copying the whole dict
+        bindings = mu.bindings if isinstance(mu.bindings, PMap) else pmap(mu.bindings)
+        return SolutionMapping(bindings=bindings.set(var.name, value))
     new_bindings = {**mu.bindings, var.name: value}
     return SolutionMapping(bindings=new_bindings)
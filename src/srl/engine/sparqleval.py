@@ -0,0 +1,138 @@
+"""
+Basic graph pattern evaluator for rdflib's SPARQL engine.
+
+Opt-in: call register() to route rdflib's BGP evaluation through evalBGP
+in the current process, and unregister() to restore rdflib's own evaluator.
+The patterns are ordered by estimated
+cardinality and evaluated with the engine's hash join instead of rdflib's
+pattern-by-pattern nested loop.
+"""
+
+from typing import Dict, Iterator, List, Set, Tuple
+
+from rdflib import BNode, Graph, Variable
+from rdflib.term import Node
+from rdflib.plugins.sparql import CUSTOM_EVALS
+from rdflib.plugins.sparql.sparql import FrozenBindings, QueryContext
+
+from .solutions import SolutionMapping, join
+
+_Triple = Tuple[Node, Node, Node]
+# A pattern's terms and, per position, whether it is still a variable
+_Pattern = Tuple[_Triple, Tuple[bool, bool, bool]]
+
+
+def register() -> None:
+    """Evaluate the BGPs of every rdflib SPARQL query in this process with evalBGP."""
+    CUSTOM_EVALS["srl_bgp"] = evalBGP
+
+
+def unregister() -> None:
+    """Restore rdflib's own BGP evaluation."""
+    CUSTOM_EVALS.pop("srl_bgp", None)
+
+
+def evalBGP(ctx: QueryContext, part) -> Iterator[FrozenBindings]:
+    """
+    Custom rdflib evaluation hook for BGP algebra nodes.
+
+    Raises NotImplementedError for any other part so that rdflib falls back
+    to its own evaluator.
+    """
+    if part.name != "BGP":
+        raise NotImplementedError()
+    return _eval_bgp(ctx, part.triples)
+
+
+def _eval_bgp(ctx: QueryContext, bgp: List[_Triple]) -> Iterator[FrozenBindings]:
+    graph = ctx.graph
+    patterns = [_bind(ctx, triple) for triple in bgp]
+
+    solutions = [SolutionMapping()]
+    for pattern in _order_patterns(graph, patterns):
+        solutions = join(solutions, _match(graph, pattern))
+        if not solutions:
+            return
+
+    for mu in solutions:
+        c = ctx.push()
+        for var, value in mu.bindings.items():
+            c[var] = value
+        yield c.solution()
+
+
+def _is_var(term) -> bool:
+    return isinstance(term, (Variable, BNode))
+
+
+def _bind(ctx: QueryContext, triple: _Triple) -> _Pattern:
+    """
+    Replace variables already bound in the context by their value.
+
+    The value is a constant from then on, even when it is a blank node, so
+    the positions that are still variables are returned alongside.
+    """
+    terms = []
+    free = []
+    for term in triple:
+        if _is_var(term):
+            value = ctx[term]
+            if value is not None:
+                term = value
+            free.append(value is None)
+        else:
+            free.append(False)
+        terms.append(term)
+    return tuple(terms), tuple(free)
+
+
+def _query(pattern: _Pattern) -> _Triple:
+    """The pattern as a triples() query, with None for its variables."""
+    terms, free = pattern
+    return tuple(None if is_free else term for term, is_free in zip(terms, free))
+
+
+def _variables(pattern: _Pattern) -> Set[Node]:
+    terms, free = pattern
+    return {term for term, is_free in zip(terms, free) if is_free}
+
+
+def _order_patterns(graph: Graph, patterns: List[_Pattern]) -> List[_Pattern]:
+    """
+    Order patterns by estimated cardinality, preferring at each step a
+    pattern that shares a variable with those already placed so the join
+    never degenerates into a cross product when it can be avoided.
+    """
+    counts: Dict[_Triple, int] = {}
+
+    def estimate(pattern: _Pattern) -> int:
+        key = _query(pattern)
+        if key not in counts:
+            counts[key] = sum(1 for _ in graph.triples(key))
+        return counts[key]
+
+    remaining = sorted(patterns, key=estimate)
+    ordered: List[_Pattern] = []
+    seen: Set[Node] = set()
+    while remaining:
+        pick = next((p for p in remaining if not seen.isdisjoint(_variables(p))), remaining[0])
+        remaining.remove(pick)
+        ordered.append(pick)
+        seen |= _variables(pick)
+    return ordered
+
+
+def _match(graph: Graph, pattern: _Pattern) -> List[SolutionMapping]:
+    """Match one pattern of rdflib terms, binding its variables."""
+    terms, free = pattern
+    solutions: List[SolutionMapping] = []
+    for triple in graph.triples(_query(pattern)):
+        bindings: Dict[Node, Node] = {}
+        for term, is_free, value in zip(terms, free, triple):
+            if not is_free:
+                continue
+            if bindings.setdefault(term, value) != value:
+                break
+        else:
+            solutions.append(SolutionMapping(bindings=bindings))
+    return solutions
@@ -5,26 +5,37 @@ Implements Section 5.4 of the specification: stratifying a rule set
 to determine evaluation order and detect problematic negation cycles.
 """
 
+import sys
+from collections import defaultdict, deque
 from dataclasses import dataclass
-from typing import List, Set, Tuple
+from functools import lru_cache
+from typing import AbstractSet, DefaultDict, Dict, FrozenSet, Iterator, List, Sequence, Tuple
 
 from ..ast.nodes import (
+    IRI,
     Rule,
     RuleSet,
     Variable,
     TriplePattern,
+    TripleTemplate,
     NegationElement,
+    InversePath,
+    PathSequence,
 )
 
 
+# A rule's (head, body, negated body) predicate sets
+PredicateSignature = Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]
+
+
 @dataclass
 class StrataInfo:
     """Information about a rule's stratum."""
 
     rule_index: int
     stratum: int
-    depends_on: Set[int]  # Indices of rules this rule depends on
-    negatively_depends_on: Set[int]  # Indices with negation dependency
+    depends_on: int  # Bitmask of rules this rule depends on (bit j = rule j)
+    negatively_depends_on: int  # Bitmask of rules with negation dependency
 
 
 class StratificationError(Exception):
@@ -33,6 +44,14 @@ class StratificationError(Exception):
     pass
 
 
+def iter_bits(mask: int) -> Iterator[int]:
+    """Iterate over the indices of the set bits of a bitmask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 def stratify_rules(rule_set: RuleSet) -> List[List[int]]:
     """
     Stratify a rule set into evaluation layers.
@@ -48,8 +67,9 @@ def stratify_rules(rule_set: RuleSet) -> List[List[int]]:
     1. Build dependency graph: for each rule, identify which rules it depends on
        - Positive dependency: head of rule B matches body pattern of rule A
        - Negative dependency: head of rule B matches negated pattern in rule A
-    2. Detect cycles through negation (error condition)
-    3. Assign stratum levels using topological sort with negation constraints
+    2. In one pass over the strongly connected components, dependencies
+       first: reject components containing a negative edge (a cycle through
+       negation) and assign each the lowest stratum its dependencies allow
 
     Args:
         rule_set: Set of rules to stratify
@@ -66,16 +86,32 @@ def stratify_rules(rule_set: RuleSet) -> List[List[int]]:
     if n == 0:
         return []
 
-    # Build dependency graph
-    dependencies = compute_dependencies(rules)
+    # Strata depend only on each rule's predicate signature, so identical
+    # signatures (e.g. a reloaded rule set) reuse the earlier result
+    signature = tuple(_predicate_signature(rule) for rule in rules)
+    return [list(stratum) for stratum in _stratify_signature(signature)]
+
+
+def _predicate_signature(rule: Rule) -> PredicateSignature:
+    """Return a rule's (head, body, negated body) predicate sets."""
+    return (
+        extract_head_predicates(rule),
+        extract_body_predicates(rule, negated=False),
+        extract_body_predicates(rule, negated=True),
+    )
 
-    # Detect cycles through negation
-    detect_negation_cycles(dependencies)
 
-    # Assign strata using topological sort
-    strata = assign_strata(dependencies, n)
+@lru_cache(maxsize=128)
+def _stratify_signature(signature: Tuple[PredicateSignature, ...]) -> Tuple[Tuple[int, ...], ...]:
+    """Stratify rules given only their predicate signatures (memoized)."""
+    # Build dependency graph
+    dependencies = _dependencies_from_signature(signature)
+
+    # Assign strata over the strongly connected components; the same pass
+    # detects cycles through negation
+    strata, _ = assign_strata(dependencies, len(signature))
 
-    return strata
+    return tuple(tuple(stratum) for stratum in strata)
 
 
 def compute_dependencies(rules: List[Rule]) -> List[StrataInfo]:
@@ -94,29 +130,47 @@ def compute_dependencies(rules: List[Rule]) -> List[StrataInfo]:
     Returns:
         List of StrataInfo, one per rule
     """
-    dependencies = []
-
-    for i, rule in enumerate(rules):
-        depends_on = set()
-        neg_depends_on = set()
-
-        # Check dependencies with other rules
-        for j, other_rule in enumerate(rules):
-            if i == j:
-                continue
-
-            # Check if other_rule's head could match our body patterns
-            other_head_preds = extract_head_predicates(other_rule)
+    # Extract each rule's predicates once rather than once per rule pair
+    return _dependencies_from_signature([_predicate_signature(rule) for rule in rules])
 
-            # Positive dependencies: body patterns
-            body_preds = extract_body_predicates(rule, negated=False)
-            if predicates_overlap(other_head_preds, body_preds):
-                depends_on.add(j)
 
-            # Negative dependencies: negated patterns
-            neg_body_preds = extract_body_predicates(rule, negated=True)
-            if predicates_overlap(other_head_preds, neg_body_preds):
-                neg_depends_on.add(j)
+def _dependencies_from_signature(signature: Sequence[PredicateSignature]) -> List[StrataInfo]:
+    """Compute rule dependencies from per-rule predicate signatures."""
+    dependencies = []
+    head_preds = [head for head, _, _ in signature]
+    body_preds = [body for _, body, _ in signature]
+    neg_body_preds = [neg_body for _, _, neg_body in signature]
+
+    # Inverted index: predicate -> bitmask of rules whose head emits it.
+    # Heads with a variable predicate can produce anything.
+    producers: Dict[str, int] = {}
+    wildcard_producers = 0
+    any_producers = 0
+    for j, preds in enumerate(head_preds):
+        for pred in preds:
+            if pred == "*":
+                wildcard_producers |= 1 << j
+            else:
+                producers[pred] = producers.get(pred, 0) | (1 << j)
+        if preds:
+            any_producers |= 1 << j
+
+    def producers_of(preds: FrozenSet[str]) -> int:
+        if not preds:
+            return 0
+        if "*" in preds:
+            return any_producers
+        mask = wildcard_producers
+        for pred in preds:
+            mask |= producers.get(pred, 0)
+        return mask
+
+    for i in range(len(signature)):
+        not_self = ~(1 << i)
+        # Positive dependencies: body patterns
+        depends_on = producers_of(body_preds[i]) & not_self
+        # Negative dependencies: negated patterns
+        neg_depends_on = producers_of(neg_body_preds[i]) & not_self
 
         info = StrataInfo(
             rule_index=i,
@@ -129,29 +183,26 @@ def compute_dependencies(rules: List[Rule]) -> List[StrataInfo]:
     return dependencies
 
 
-def extract_head_predicates(rule: Rule) -> Set[str]:
+def extract_head_predicates(rule: Rule) -> FrozenSet[str]:
     """
     Extract predicates from rule head templates.
 
-    Returns set of predicate URIs or '*' for variables.
+    Returns frozenset of interned predicate URIs or '*' for variables.
     """
     predicates = set()
 
     for template in rule.head.templates:
-        if hasattr(template, "predicate"):
+        if isinstance(template, (TripleTemplate, TriplePattern)):
             pred = template.predicate
             if isinstance(pred, Variable):
                 predicates.add("*")  # Variable predicate - matches anything
-            else:
-                from ..ast.nodes import IRI
-
-                if isinstance(pred, IRI):
-                    predicates.add(pred.value)
+            elif isinstance(pred, IRI):
+                predicates.add(sys.intern(pred.value))
 
-    return predicates
+    return frozenset(predicates)
 
 
-def extract_body_predicates(rule: Rule, negated: bool = False) -> Set[str]:
+def extract_body_predicates(rule: Rule, negated: bool = False) -> FrozenSet[str]:
     """
     Extract predicates from rule body patterns.
 
@@ -160,7 +211,7 @@ def extract_body_predicates(rule: Rule, negated: bool = False) -> Set[str]:
         negated: If True, extract from negated patterns; else from positive patterns
 
     Returns:
-        Set of predicate URIs or '*' for variables
+        Frozenset of interned predicate URIs or '*' for variables
     """
     predicates = set()
 
@@ -170,11 +221,8 @@ def extract_body_predicates(rule: Rule, negated: bool = False) -> Set[str]:
             pred = pattern.predicate
             if isinstance(pred, Variable):
                 predicates.add("*")
-            else:
-                from ..ast.nodes import IRI
-
-                if isinstance(pred, IRI):
-                    predicates.add(pred.value)
+            elif isinstance(pred, IRI):
+                predicates.add(sys.intern(pred.value))
 
     for element in rule.body.elements:
         if negated:
@@ -187,10 +235,10 @@ def extract_body_predicates(rule: Rule, negated: bool = False) -> Set[str]:
             if isinstance(element, TriplePattern):
                 process_pattern(element)
 
-    return predicates
+    return frozenset(predicates)
 
 
-def predicates_overlap(preds1: Set[str], preds2: Set[str]) -> bool:
+def predicates_overlap(preds1: AbstractSet[str], preds2: AbstractSet[str]) -> bool:
     """
     Check if two predicate sets could overlap.
 
@@ -206,7 +254,24 @@ def predicates_overlap(preds1: Set[str], preds2: Set[str]) -> bool:
     if "*" in preds1 or "*" in preds2:
         return True
 
-    return len(preds1 & preds2) > 0
+    if len(preds1) > len(preds2):
+        preds1, preds2 = preds2, preds1
+    return not preds1.isdisjoint(preds2)
+
+
+def is_self_recursive(rule: Rule) -> bool:
+    """
+    Check if a rule's head could produce triples its own body matches.
+
+    Property path predicates are not covered by extract_body_predicates, so
+    a body containing one is treated as recursive.
+    """
+    for element in rule.body.elements:
+        if isinstance(element, TriplePattern) and isinstance(
+            element.predicate, (InversePath, PathSequence)
+        ):
+            return True
+    return predicates_overlap(extract_head_predicates(rule), extract_body_predicates(rule))
 
 
 def detect_negation_cycles(dependencies: List[StrataInfo]) -> None:
@@ -217,7 +282,9 @@ def detect_negation_cycles(dependencies: List[StrataInfo]) -> None:
     "A stratification error occurs if there exists a cycle in the dependency
     graph that includes at least one negative edge."
 
-    Uses depth-first search to detect cycles.
+    A cycle contains a negative edge exactly when both ends of that edge
+    lie in the same strongly connected component, so the check is a
+    single iterative pass with no per-path bookkeeping.
 
     Args:
         dependencies: Dependency information for all rules
@@ -226,134 +293,183 @@ def detect_negation_cycles(dependencies: List[StrataInfo]) -> None:
         StratificationError: If a cycle through negation is detected
     """
     n = len(dependencies)
-
-    # States: 0 = unvisited, 1 = visiting, 2 = visited
-    state = [0] * n
-
-    def dfs(node: int, path: List[int], neg_edges: Set[Tuple[int, int]]) -> None:
-        """
-        DFS to detect cycles with negation.
-
-        Args:
-            node: Current rule index
-            path: Current path of rule indices
-            neg_edges: Set of negative edges (i, j) encountered in current path
-        """
-        state[node] = 1  # Mark as visiting
-        path.append(node)
-
-        info = dependencies[node]
-
-        # Check positive dependencies
-        for neighbor in info.depends_on:
-            if state[neighbor] == 1:
-                # Found cycle - check if it includes a negative edge
-                cycle_start = path.index(neighbor)
-                cycle = path[cycle_start:]
-
-                # Check if cycle includes any negative edge
-                for i in range(len(cycle)):
-                    curr = cycle[i]
-                    next_node = cycle[(i + 1) % len(cycle)]
-                    if (curr, next_node) in neg_edges:
-                        # Cycle through negation!
-                        raise StratificationError(
-                            f"Cycle through negation detected: {' -> '.join(map(str, cycle + [neighbor]))}"
-                        )
-            elif state[neighbor] == 0:
-                dfs(neighbor, path, neg_edges)
-
-        # Check negative dependencies
-        for neighbor in info.negatively_depends_on:
-            neg_edges_with_current = neg_edges | {(node, neighbor)}
-
-            if state[neighbor] == 1:
-                # Found cycle with negative edge
-                cycle_start = path.index(neighbor)
-                cycle = path[cycle_start:]
+    component_of = [0] * n
+    for c, component in enumerate(strongly_connected_components(dependencies, n)):
+        for i in component:
+            component_of[i] = c
+
+    for node, info in enumerate(dependencies):
+        for neighbor in iter_bits(info.negatively_depends_on):
+            if component_of[neighbor] == component_of[node]:
+                cycle = [node] + _find_path(dependencies, neighbor, node, component_of)
                 raise StratificationError(
-                    f"Cycle through negation detected: {' -> '.join(map(str, cycle + [neighbor]))} (negative edge)"
+                    f"Cycle through negation detected: {' -> '.join(map(str, cycle))} (negative edge)"
                 )
-            elif state[neighbor] == 0:
-                dfs(neighbor, path, neg_edges_with_current)
 
-        path.pop()
-        state[node] = 2  # Mark as visited
 
-    # Run DFS from each unvisited node
-    for i in range(n):
-        if state[i] == 0:
-            dfs(i, [], set())
+def _find_path(dependencies: List[StrataInfo], start: int, goal: int, component_of: List[int]) -> List[int]:
+    """Breadth-first search for a dependency path within one component."""
+    parent = {start: start}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        if node == goal:
+            break
+        for succ in _successors(dependencies[node]):
+            if succ not in parent and component_of[succ] == component_of[start]:
+                parent[succ] = node
+                queue.append(succ)
+
+    path = [goal]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    return path[::-1]
 
 
-def assign_strata(dependencies: List[StrataInfo], n: int) -> List[List[int]]:
+def assign_strata(dependencies: List[StrataInfo], n: int) -> Tuple[List[List[int]], List[int]]:
     """
-    Assign stratum levels to rules using topological sort.
+    Assign stratum levels to rules in one pass over the dependency graph.
 
     Rules are assigned to the lowest stratum possible while respecting:
     1. Positive dependencies: rules can be in the SAME stratum (allows recursion)
     2. Negative dependencies: rule MUST be in a STRICTLY higher stratum
 
+    The strongly connected components of the dependency graph are visited
+    dependencies-first; each component's stratum is the longest path to it
+    in the condensation, where negative edges count 1 and positive edges 0.
+
     Args:
         dependencies: Dependency information
         n: Number of rules
 
     Returns:
-        List of strata, each containing rule indices
+        Tuple of (strata, stratum_of): the list of strata, each containing
+        rule indices, and the stratum of each rule indexed by rule
+
+    Raises:
+        StratificationError: If a component contains a negative edge
     """
-    # Initialize all rules to stratum 0
     stratum = [0] * n
 
-    # Iteratively increase stratum until all constraints satisfied
-    changed = True
-    max_iterations = n * n + 1  # Prevent infinite loop
-    iteration = 0
-
-    while changed and iteration < max_iterations:
-        changed = False
-        iteration += 1
+    for component in strongly_connected_components(dependencies, n):
+        members = 0
+        for i in component:
+            members |= 1 << i
+        required_stratum = 0
 
-        for i in range(n):
+        for i in component:
             info = dependencies[i]
-            current_stratum = stratum[i]
-            required_stratum = 0
-
-            # Positive dependencies: can be in same stratum (for recursion)
-            # No stratum constraint needed for positive deps
-
-            # Negative dependencies: must be in strictly higher stratum
-            for dep in info.negatively_depends_on:
+            inner_negative = info.negatively_depends_on & members
+            if inner_negative:
+                dep = next(iter_bits(inner_negative))
+                in_component = [(members >> k) & 1 for k in range(n)]
+                cycle = [i] + _find_path(dependencies, dep, i, in_component)
+                raise StratificationError(
+                    f"Cycle through negation detected: {' -> '.join(map(str, cycle))} (negative edge)"
+                )
+            for dep in iter_bits(info.depends_on & ~members):
+                required_stratum = max(required_stratum, stratum[dep])
+            for dep in iter_bits(info.negatively_depends_on):
                 required_stratum = max(required_stratum, stratum[dep] + 1)
 
-            if required_stratum > current_stratum:
-                stratum[i] = required_stratum
-                changed = True
+        for i in component:
+            stratum[i] = required_stratum
+            dependencies[i].stratum = required_stratum
 
     # Group rules by stratum
-    max_stratum = max(stratum) if stratum else 0
-    strata: List[List[int]] = [[] for _ in range(max_stratum + 1)]
-
+    by_stratum: DefaultDict[int, List[int]] = defaultdict(list)
     for i, s in enumerate(stratum):
-        strata[s].append(i)
-        # Update dependencies info
-        dependencies[i].stratum = s
+        by_stratum[s].append(i)
+
+    strata = [by_stratum[s] for s in range(max(by_stratum, default=0) + 1)]
+
+    return strata, stratum
+
+
+def strongly_connected_components(dependencies: List[StrataInfo], n: int) -> List[List[int]]:
+    """
+    Compute the strongly connected components of the dependency graph.
+
+    Iterative Tarjan's algorithm over the edges rule -> dependency (positive
+    and negative alike). Components are returned in reverse topological
+    order, so every component comes after the components it depends on.
+
+    Args:
+        dependencies: Dependency information
+        n: Number of rules
+
+    Returns:
+        List of components, each a list of rule indices
+    """
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, _successors(dependencies[root]))]
+
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for succ in successors:
+                if index[succ] == -1:
+                    index[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack[succ] = True
+                    work.append((succ, _successors(dependencies[succ])))
+                    advanced = True
+                    break
+                elif on_stack[succ]:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+
+    return components
+
 
-    return strata
+def _successors(info: StrataInfo) -> Iterator[int]:
+    """Iterate over all rules a rule depends on, positively or negatively."""
+    return iter_bits(info.depends_on | info.negatively_depends_on)
 
 
-def get_rule_stratum(rule_index: int, strata: List[List[int]]) -> int:
+def get_rule_stratum(rule_index: int, stratum_of: List[int]) -> int:
     """
     Get the stratum number for a specific rule.
 
     Args:
         rule_index: Index of the rule
-        strata: Stratification result
+        stratum_of: Per-rule strata, as returned by assign_strata
 
     Returns:
-        Stratum number (0-indexed)
+        Stratum number (0-indexed), or -1 if the index is out of range
     """
-    for stratum_num, rule_indices in enumerate(strata):
-        if rule_index in rule_indices:
-            return stratum_num
+    if 0 <= rule_index < len(stratum_of):
+        return stratum_of[rule_index]
 
     return -1  # Not found
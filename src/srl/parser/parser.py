@@ -2,12 +2,21 @@
 Main parser class for SHACL 1.2 Rules (Shape Rule Language).
 """
 
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable, List, Optional
 
 from lark import Lark, UnexpectedInput, UnexpectedToken, UnexpectedCharacters
+from lark.exceptions import VisitError
 
 from .transformer import SRLTransformer
-from ..ast import RuleSet
+from ..ast import Rule, RuleSet
 
 
 class ParseError(Exception):
@@ -15,6 +24,89 @@ class ParseError(Exception):
     pass
 
 
+@lru_cache(maxsize=1)
+def _load_grammar() -> str:
+    """Read the SRL grammar once per process."""
+    grammar_path = Path(__file__).parent / "grammar.lark"
+    try:
+        with open(grammar_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        raise ParseError(f"Grammar file not found: {grammar_path}")
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> Lark:
+    """
+    Build the Lark parser once per process.
+
+    The parser holds no transformer, so a single instance can be shared by
+    every SRLParser; each parse gets its own SRLTransformer instead.
+    """
+    try:
+        return Lark(
+            _load_grammar(),
+            start='rule_set',
+            parser='lalr',  # LALR(1) parser for efficiency
+            # Reuse the LALR tables across processes; Lark keys the cache
+            # file on the grammar text, options and its own version.
+            cache=True,
+        )
+    except Exception as e:
+        raise ParseError(f"Failed to initialize parser: {e}")
+
+
+# Parsed rule sets keyed by a digest of their source text, least recently used first
+_AST_CACHE: "OrderedDict[bytes, RuleSet]" = OrderedDict()
+_AST_CACHE_SIZE = 128
+_AST_CACHE_LOCK = threading.Lock()
+
+# One reusable transformer per thread, shared by every SRLParser so that
+# documents repeating the same PREFIX lines reuse its resolved names
+_LOCAL = threading.local()
+
+
+def _source_key(text: str) -> bytes:
+    """
+    Digest the source text so the cache does not keep whole documents alive.
+    
+    Surrounding whitespace never changes the parse and is left out of the key.
+    Nothing inside the text is normalised: whitespace and '#' can be part of
+    string literals and IRIs, and variable names are visible in the AST.
+    """
+    return hashlib.blake2b(text.strip().encode('utf-8'), digest_size=16).digest()
+
+
+def _copy_rule_set(rule_set: RuleSet) -> RuleSet:
+    """
+    Copy a cached RuleSet for one caller.
+
+    The rule set, its prologue, its rules and their lists are copied, so a
+    caller modifying them cannot affect later parses; the frozen AST nodes
+    inside are shared.
+    """
+    rules = {id(rule): replace(rule, depends_on=list(rule.depends_on)) for rule in rule_set.rules}
+
+    def copy_rules(originals: List[Rule]) -> List[Rule]:
+        return [rules.get(id(rule), rule) for rule in originals]
+
+    for rule in rules.values():
+        rule.depends_on[:] = copy_rules(rule.depends_on)
+
+    prologue = rule_set.prologue
+    return RuleSet(
+        prologue=replace(
+            prologue, prefixes=dict(prologue.prefixes), imports=list(prologue.imports)
+        ),
+        rules=copy_rules(rule_set.rules),
+        data_blocks=list(rule_set.data_blocks),
+        declarations=list(rule_set.declarations),
+        layers=(
+            None if rule_set.layers is None else [copy_rules(layer) for layer in rule_set.layers]
+        ),
+    )
+
+
 class SRLParser:
     """
     Parser for the Shape Rule Language (SRL).
@@ -24,28 +116,16 @@ class SRLParser:
     
     def __init__(self):
         """Initialize the parser with the SRL grammar."""
-        grammar_path = Path(__file__).parent / "grammar.lark"
-        
-        try:
-            with open(grammar_path, 'r', encoding='utf-8') as f:
-                grammar = f.read()
-        except FileNotFoundError:
-            raise ParseError(f"Grammar file not found: {grammar_path}")
-        
-        try:
-            self.parser = Lark(
-                grammar,
-                start='rule_set',
-                parser='lalr',  # LALR(1) parser for efficiency
-                transformer=SRLTransformer(),
-            )
-        except Exception as e:
-            raise ParseError(f"Failed to initialize parser: {e}")
+        self.parser = _build_parser()
     
     def parse(self, text: str) -> RuleSet:
         """
         Parse SRL text into an AST RuleSet.
         
+        Results are cached by source text (ignoring surrounding whitespace).
+        Each call returns its own copy of the RuleSet and its rules, sharing
+        the immutable AST nodes inside them.
+        
         Args:
             text: SRL source code
             
@@ -55,8 +135,18 @@ class SRLParser:
         Raises:
             ParseError: If parsing fails
         """
+        key = _source_key(text)
+        with _AST_CACHE_LOCK:
+            rule_set = _AST_CACHE.get(key)
+            if rule_set is not None:
+                _AST_CACHE.move_to_end(key)
+                return _copy_rule_set(rule_set)
+
         try:
-            return self.parser.parse(text)
+            tree = self.parser.parse(text)
+            rule_set = self._transformer().transform(tree)
+        except VisitError as e:
+            raise ParseError(f"Parse error: {e.orig_exc}") from e.orig_exc
         except UnexpectedToken as e:
             raise ParseError(
                 f"Unexpected token '{e.token}' at line {e.line}, column {e.column}"
@@ -75,6 +165,21 @@ class SRLParser:
             ) from e
         except Exception as e:
             raise ParseError(f"Parse error: {e}") from e
+        
+        with _AST_CACHE_LOCK:
+            _AST_CACHE[key] = rule_set
+            if len(_AST_CACHE) > _AST_CACHE_SIZE:
+                _AST_CACHE.popitem(last=False)
+        return _copy_rule_set(rule_set)
+    
+    def _transformer(self) -> SRLTransformer:
+        """Get this thread's transformer, reset for a new document."""
+        transformer = getattr(_LOCAL, 'transformer', None)
+        if transformer is None:
+            transformer = _LOCAL.transformer = SRLTransformer()
+        else:
+            transformer.reset()
+        return transformer
     
     def parse_file(self, filepath: str) -> RuleSet:
         """
@@ -99,3 +204,36 @@ class SRLParser:
             raise ParseError(f"Failed to read file: {e}")
         
         return self.parse(text)
+    
+    def parse_files(self, filepaths: Iterable[str], max_workers: Optional[int] = None) -> List[RuleSet]:
+        """
+        Parse several SRL files, in parallel worker processes.
+        
+        Each worker builds its own parser, which loads the LALR tables from
+        Lark's on-disk cache; the shared Lark object is only ever used
+        read-only, so parsing in threads is safe as well.
+        
+        Args:
+            filepaths: Paths to SRL files
+            max_workers: Number of worker processes (default: CPU count)
+            
+        Returns:
+            RuleSet AST nodes, in the order of filepaths
+            
+        Raises:
+            ParseError: If parsing any file fails
+            FileNotFoundError: If a file doesn't exist
+        """
+        filepaths = list(filepaths)
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if len(filepaths) <= 1 or max_workers <= 1:
+            return [self.parse_file(filepath) for filepath in filepaths]
+        
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(filepaths))) as pool:
+            return list(pool.map(_parse_file, filepaths))
+
+
+def _parse_file(filepath: str) -> RuleSet:
+    """Parse one file in a worker process."""
+    return SRLParser().parse_file(filepath)
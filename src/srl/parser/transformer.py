@@ -6,9 +6,14 @@ the AST nodes defined in srl.ast.nodes, following the abstract syntax
 from Section 3 of the SHACL 1.2 Rules specification.
 """
 
-from typing import Dict
+import sys
+from collections import ChainMap
+from itertools import chain
+from types import MappingProxyType
+from typing import Dict, Mapping
+from uuid import uuid4
 
-from lark import Transformer, Token
+from lark import Transformer, Token, v_args
 
 from ..ast.nodes import (
     # Core structures
@@ -46,21 +51,150 @@ from ..ast.nodes import (
     ExistsExpression,
     BinaryOperator,
     UnaryOperator,
+    structural_key,
 )
 
-# Standard well-known prefixes
-STANDARD_PREFIXES: Dict[str, str] = {
-    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
-    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
-    "xsd": "http://www.w3.org/2001/XMLSchema#",
-    "sh": "http://www.w3.org/ns/shacl#",
-    "owl": "http://www.w3.org/2002/07/owl#",
-    "dc": "http://purl.org/dc/elements/1.1/",
-    "dcterms": "http://purl.org/dc/terms/",
-    "foaf": "http://xmlns.com/foaf/0.1/",
-    "skos": "http://www.w3.org/2004/02/skos/core#",
+# Standard well-known prefixes, shared read-only by every transformer
+STANDARD_PREFIXES: Mapping[str, str] = MappingProxyType(
+    {
+        "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+        "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+        "xsd": "http://www.w3.org/2001/XMLSchema#",
+        "sh": "http://www.w3.org/ns/shacl#",
+        "owl": "http://www.w3.org/2002/07/owl#",
+        "dc": "http://purl.org/dc/elements/1.1/",
+        "dcterms": "http://purl.org/dc/terms/",
+        "foaf": "http://xmlns.com/foaf/0.1/",
+        "skos": "http://www.w3.org/2004/02/skos/core#",
+    }
+)
+
+
+# Grammar rules for built-in calls that take their arguments as parsed
+_BUILTIN_FUNCTIONS: Dict[str, str] = {
+    "builtin_str": "STR",
+    "builtin_lang": "LANG",
+    "builtin_langmatches": "LANGMATCHES",
+    "builtin_langdir": "LANGDIR",
+    "builtin_datatype": "DATATYPE",
+    "builtin_bound": "BOUND",
+    "builtin_iri": "IRI",
+    "builtin_uri": "URI",
+    "builtin_bnode": "BNODE",
+    "builtin_abs": "ABS",
+    "builtin_ceil": "CEIL",
+    "builtin_floor": "FLOOR",
+    "builtin_round": "ROUND",
+    "builtin_substr": "SUBSTR",
+    "builtin_strlen": "STRLEN",
+    "builtin_replace": "REPLACE",
+    "builtin_ucase": "UCASE",
+    "builtin_lcase": "LCASE",
+    "builtin_encode_for_uri": "ENCODE_FOR_URI",
+    "builtin_contains": "CONTAINS",
+    "builtin_strstarts": "STRSTARTS",
+    "builtin_strends": "STRENDS",
+    "builtin_strbefore": "STRBEFORE",
+    "builtin_strafter": "STRAFTER",
+    "builtin_year": "YEAR",
+    "builtin_month": "MONTH",
+    "builtin_day": "DAY",
+    "builtin_hours": "HOURS",
+    "builtin_minutes": "MINUTES",
+    "builtin_seconds": "SECONDS",
+    "builtin_timezone": "TIMEZONE",
+    "builtin_tz": "TZ",
+    "builtin_md5": "MD5",
+    "builtin_sha1": "SHA1",
+    "builtin_sha256": "SHA256",
+    "builtin_sha384": "SHA384",
+    "builtin_sha512": "SHA512",
+    "builtin_if": "IF",
+    "builtin_strlang": "STRLANG",
+    "builtin_strlangdir": "STRLANGDIR",
+    "builtin_strdt": "STRDT",
+    "builtin_sameterm": "sameTerm",
+    "builtin_isiri": "isIRI",
+    "builtin_isuri": "isURI",
+    "builtin_isblank": "isBLANK",
+    "builtin_isliteral": "isLITERAL",
+    "builtin_isnumeric": "isNUMERIC",
+    "builtin_haslang": "hasLANG",
+    "builtin_haslangdir": "hasLANGDIR",
+    "builtin_regex": "REGEX",
+    "builtin_istriple": "isTRIPLE",
+    "builtin_triple": "TRIPLE",
+    "builtin_subject": "SUBJECT",
+    "builtin_predicate": "PREDICATE",
+    "builtin_object": "OBJECT",
+}
+
+# Grammar rules for built-in calls without arguments (RAND(), NOW(), ...)
+_NULLARY_BUILTIN_FUNCTIONS: Dict[str, str] = {
+    "builtin_rand": "RAND",
+    "builtin_now": "NOW",
+    "builtin_uuid": "UUID",
+    "builtin_struuid": "STRUUID",
+}
+
+
+# Built-ins that can return a different value on each call
+_NONDETERMINISTIC_BUILTINS = frozenset(("RAND", "NOW", "UUID", "STRUUID", "BNODE"))
+
+
+# Shared IRIs for 'a' and the datatypes of numeric and boolean literals
+RDF_TYPE = IRI("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+XSD_INTEGER = IRI("http://www.w3.org/2001/XMLSchema#integer")
+XSD_DECIMAL = IRI("http://www.w3.org/2001/XMLSchema#decimal")
+XSD_DOUBLE = IRI("http://www.w3.org/2001/XMLSchema#double")
+XSD_BOOLEAN = IRI("http://www.w3.org/2001/XMLSchema#boolean")
+
+# Datatype of each numeric literal terminal, signed or not
+_NUMERIC_DATATYPES: Dict[str, IRI] = {
+    f"{kind}{sign}": datatype
+    for kind, datatype in (("INTEGER", XSD_INTEGER), ("DECIMAL", XSD_DECIMAL), ("DOUBLE", XSD_DOUBLE))
+    for sign in ("", "_POSITIVE", "_NEGATIVE")
 }
 
+# Declaration node types collected into RuleSet.declarations
+_DECLARATION_TYPES = frozenset((TransitiveDeclaration, SymmetricDeclaration, InverseDeclaration))
+
+# Operators keyed by the grammar's named operator terminals
+_LOGICAL_OPS: Dict[str, BinaryOperator] = {
+    "OR_OP": BinaryOperator.OR,
+    "AND_OP": BinaryOperator.AND,
+}
+_RELATIONAL_OPS: Dict[str, BinaryOperator] = {
+    "EQ_OP": BinaryOperator.EQ,
+    "NE_OP": BinaryOperator.NE,
+    "LT_OP": BinaryOperator.LT,
+    "GT_OP": BinaryOperator.GT,
+    "LE_OP": BinaryOperator.LE,
+    "GE_OP": BinaryOperator.GE,
+}
+_ADDITIVE_OPS: Dict[str, BinaryOperator] = {
+    "PLUS_OP": BinaryOperator.ADD,
+    "MINUS_OP": BinaryOperator.SUB,
+}
+_MULTIPLICATIVE_OPS: Dict[str, BinaryOperator] = {
+    "TIMES_OP": BinaryOperator.MUL,
+    "DIV_OP": BinaryOperator.DIV,
+}
+_UNARY_OPS: Dict[str, UnaryOperator] = {
+    "BANG_OP": UnaryOperator.NOT,
+    "PLUS_OP": UnaryOperator.PLUS,
+    "MINUS_OP": UnaryOperator.MINUS,
+}
+
+
+def _left_fold(items, ops: Dict[str, BinaryOperator]):
+    """Fold interleaved ``expr, OP, expr, OP, expr`` items into left-nested BinaryOps."""
+    it = iter(items)
+    result = next(it)
+    for token in it:
+        result = BinaryOp(operator=ops[token.type], left=result, right=next(it))
+    return result
+
 
 class SRLTransformer(Transformer):
     """
@@ -73,8 +207,31 @@ class SRLTransformer(Transformer):
     def __init__(self):
         """Initialize transformer with prefix tracking."""
         super().__init__()
-        # Start with standard well-known prefixes
-        self._prefixes: Dict[str, str] = dict(STANDARD_PREFIXES)
+        # Prefixes declared by the document, layered over the standard ones
+        self._user_prefixes: Dict[str, str] = {}
+        self._prefixes = ChainMap(self._user_prefixes, STANDARD_PREFIXES)
+        # Resolved prefixed names, valid for the user prefixes in _cache_prefixes.
+        # Checked lazily so documents repeating the same PREFIX lines share it.
+        self._iri_cache: Dict[str, IRI] = {}
+        self._cache_prefixes: Dict[str, str] = {}
+        self._cache_checked = True
+        # Anonymous blank nodes are labelled with a random prefix drawn once
+        # per parse and a counter, so labels never repeat across parses
+        self._anon_prefix = ""
+        self._anon_counter = 0
+
+    def reset(self):
+        """
+        Return to the state of a fresh transformer so it can be reused for
+        another document.
+
+        Resolved prefixed names are kept as long as the next document declares
+        the same prefixes, since they resolve identically.
+        """
+        if self._user_prefixes:
+            self._user_prefixes.clear()
+            self._cache_checked = False
+        self._anon_counter = 0
 
     # ========================================================================
     # Top-level structures
@@ -82,20 +239,11 @@ class SRLTransformer(Transformer):
 
     def rule_set(self, items):
         """[1] RuleSet ::= ( Prologue ( Rule | Data ) )*"""
-        prologue = Prologue()
-        rules = []
-        data_blocks = []
-        declarations = []
-
-        for item in items:
-            if isinstance(item, Prologue):
-                prologue = item
-            elif isinstance(item, Rule):
-                rules.append(item)
-            elif isinstance(item, DataBlock):
-                data_blocks.append(item)
-            elif isinstance(item, (TransitiveDeclaration, SymmetricDeclaration, InverseDeclaration)):
-                declarations.append(item)
+        # The grammar places the single prologue first, followed by rules and data
+        prologue = items[0] if items and type(items[0]) is Prologue else Prologue()
+        rules = [item for item in items if type(item) is Rule]
+        data_blocks = [item for item in items if type(item) is DataBlock]
+        declarations = [item for item in items if type(item) in _DECLARATION_TYPES]
 
         return RuleSet(prologue=prologue, rules=rules, data_blocks=data_blocks, declarations=declarations)
 
@@ -130,7 +278,8 @@ class SRLTransformer(Transformer):
         iri_str = iri.value if isinstance(iri, IRI) else str(iri)
 
         # Store prefix in transformer state for later resolution
-        self._prefixes[prefix_token] = iri_str
+        self._user_prefixes[prefix_token] = iri_str
+        self._cache_checked = False
 
         return ("prefix", (prefix_token, IRI(iri_str)))
 
@@ -146,10 +295,11 @@ class SRLTransformer(Transformer):
     # Rules
     # ========================================================================
 
-    def rule(self, items):
+    @v_args(inline=True)
+    def rule(self, child):
         """[8] Rule ::= Rule1 | Rule2 | Rule3 | Declaration"""
         # Return the transformed rule or declaration
-        return items[0] if items else None
+        return child
 
     def declaration(self, items):
         """[12] Declaration ::= transitive_decl | symmetric_decl | inverse_decl | reflexive_decl"""
@@ -202,74 +352,64 @@ class SRLTransformer(Transformer):
 
     def body_pattern1(self, items):
         """[16] BodyPattern1 ::= BodyTriplesBlock? ( BodyNotTriples BodyTriplesBlock? )*"""
-        elements = []
-        for item in items:
-            if isinstance(item, list):
-                elements.extend(item)
-            else:
-                elements.append(item)
-        return elements
+        # Triples blocks arrive as lists of patterns, other elements one by one
+        return _dedupe_elements(
+            chain.from_iterable(item if type(item) is list else (item,) for item in items)
+        )
 
     def body_basic(self, items):
         """[20] BodyBasic ::= BodyTriplesBlock? ( Filter BodyTriplesBlock? )*"""
         # Same structure as body_pattern1 but restricted elements
-        elements = []
-        for item in items:
-            if isinstance(item, list):
-                elements.extend(item)
-            else:
-                elements.append(item)
-        return elements
+        return _dedupe_elements(
+            chain.from_iterable(item if type(item) is list else (item,) for item in items)
+        )
 
-    def data(self, items):
+    @v_args(inline=True)
+    def data(self, triples):
         """[13] Data ::= 'DATA' TriplesTemplateBlock"""
-        triples = items[0] if items else []
         return DataBlock(triples=triples)
 
     # ========================================================================
     # Body elements
     # ========================================================================
 
-    def body_not_triples(self, items):
+    @v_args(inline=True)
+    def body_not_triples(self, child):
         """[17] BodyNotTriples ::= Filter | Negation | Assignment"""
         # Just return the single element
-        return items[0]
+        return child
 
-    def filter(self, items):
+    @v_args(inline=True)
+    def filter(self, expr):
         """[29] Filter ::= 'FILTER' Constraint"""
-        expr = items[0]
         return ConditionExpression(expression=expr)
 
-    def constraint(self, items):
+    @v_args(inline=True)
+    def constraint(self, child):
         """[30] Constraint ::= BrackettedExpression | BuiltInCall | FunctionCall"""
         # Just return the expression
-        return items[0]
+        return child
 
-    def negation(self, items):
+    @v_args(inline=True)
+    def negation(self, body_patterns):
         """[19] Negation ::= 'NOT' '{' BodyBasic '}'"""
-        body_patterns = items[0] if items else []
         return NegationElement(body_patterns=body_patterns)
 
-    def assignment(self, items):
+    @v_args(inline=True)
+    def assignment(self, expr, var):
         """[26] Assignment ::= 'BIND' '(' Expression 'AS' Var ')'"""
-        expr = items[0]
-        var = items[1]
         return Assignment(variable=var, expression=expr)
 
-    def body_triples_block(self, items):
+    @v_args(inline=True)
+    def body_triples_block(self, patterns):
         """[18] BodyTriplesBlock ::= TriplesBlock"""
         # Returns list of triple patterns
-        return items[0] if items else []
+        return patterns
 
     def triples_block(self, items):
         """[23] TriplesBlock ::= TriplesSameSubjectPath ( '.' TriplesBlock? )?"""
-        patterns = []
-        for item in items:
-            if isinstance(item, list):
-                patterns.extend(item)
-            elif isinstance(item, TriplePattern):
-                patterns.append(item)
-        return patterns
+        # Both children are already lists of triple patterns
+        return list(chain.from_iterable(items))
 
     def triples_template_block(self, items):
         """[21] TriplesTemplateBlock ::= '{' TriplesTemplate? '}'"""
@@ -277,13 +417,8 @@ class SRLTransformer(Transformer):
 
     def triples_template(self, items):
         """[22] TriplesTemplate ::= TriplesSameSubject ( '.' TriplesTemplate? )?"""
-        templates = []
-        for item in items:
-            if isinstance(item, list):
-                templates.extend(item)
-            elif isinstance(item, TripleTemplate):
-                templates.append(item)
-        return templates
+        # Both children are already lists of triple templates
+        return list(chain.from_iterable(items))
 
     # ========================================================================
     # Triple patterns and templates
@@ -295,11 +430,10 @@ class SRLTransformer(Transformer):
         subject = items[0]
         property_list = items[1] if len(items) > 1 else []
 
-        templates = []
-        for pred, obj in property_list:
-            templates.append(TripleTemplate(subject=subject, predicate=pred, object=obj))
-
-        return templates
+        return [
+            TripleTemplate(subject=subject, predicate=pred, object=obj)
+            for pred, obj in property_list
+        ]
 
     def triples_same_subject_path(self, items):
         """[40] TriplesSameSubjectPath ::= VarOrTerm PropertyListPathNotEmpty | ..."""
@@ -307,74 +441,69 @@ class SRLTransformer(Transformer):
         subject = items[0]
         property_list = items[1] if len(items) > 1 else []
 
-        patterns = []
-        for pred, obj in property_list:
-            patterns.append(TriplePattern(subject=subject, predicate=pred, object=obj))
-
-        return patterns
+        return [
+            TriplePattern(subject=subject, predicate=pred, object=obj)
+            for pred, obj in property_list
+        ]
 
     def property_list_not_empty(self, items):
         """[36] PropertyListNotEmpty ::= Verb ObjectList ( ';' ( Verb ObjectList )? )*"""
-        # Returns list of (predicate, object) pairs
+        # Items alternate verb, object list; returns list of (predicate, object) pairs
         pairs = []
-        i = 0
-        while i < len(items):
-            verb = items[i]
-            i += 1
-            if i < len(items):
-                objects = items[i]
-                i += 1
-                if isinstance(objects, list):
-                    for obj in objects:
-                        pairs.append((verb, obj))
-                else:
-                    pairs.append((verb, objects))
+        for verb, objects in zip(items[0::2], items[1::2]):
+            if type(objects) is list:
+                pairs.extend([(verb, obj) for obj in objects])
+            else:
+                pairs.append((verb, objects))
         return pairs
 
-    def property_list_path_not_empty(self, items):
-        """[42] PropertyListPathNotEmpty ::= ( VerbPath | VerbSimple ) ObjectListPath ..."""
-        # Similar to property_list_not_empty
-        return self.property_list_not_empty(items)
-
-    def object_list(self, items):
-        """[38] ObjectList ::= Object ( ',' Object )*"""
-        return items
+    # [42] PropertyListPathNotEmpty ::= ( VerbPath | VerbSimple ) ObjectListPath ...
+    property_list_path_not_empty = property_list_not_empty
 
-    def object_list_path(self, items):
-        """[45] ObjectListPath ::= ObjectPath ( ',' ObjectPath )*"""
-        return items
+    # [38] ObjectList ::= Object ( ',' Object )*
+    # [45] ObjectListPath ::= ObjectPath ( ',' ObjectPath )*
+    # Lark calls the list type directly with the children, without a Python frame
+    object_list = list
+    object_list_path = list
 
     def verb(self, items):
         """[37] Verb ::= VarOrIri | 'a'"""
-        if len(items) == 1 and isinstance(items[0], str) and items[0] == "a":
-            return IRI("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+        # The anonymous 'a' keyword is filtered out of the tree, leaving no children
+        if not items:
+            return RDF_TYPE
         return items[0]
 
-    def verb_path(self, items):
+    @v_args(inline=True)
+    def verb_path(self, child):
         """[43] VerbPath ::= Path"""
-        return items[0] if items else None
+        return child
 
-    def verb_simple(self, items):
+    @v_args(inline=True)
+    def verb_simple(self, child):
         """[44] VerbSimple ::= Var"""
-        return items[0] if items else None
+        return child
 
-    def object(self, items):
+    @v_args(inline=True)
+    def object(self, node, annotation):
         """[39] Object ::= GraphNode Annotation"""
         # Return just the graph node, ignore annotation for now
-        return items[0] if items else None
+        return node
 
-    def object_path(self, items):
+    @v_args(inline=True)
+    def object_path(self, node, annotation):
         """[46] ObjectPath ::= GraphNodePath AnnotationPath"""
         # Return just the graph node, ignore annotation for now
-        return items[0] if items else None
+        return node
 
-    def graph_node(self, items):
+    @v_args(inline=True)
+    def graph_node(self, child):
         """[52] GraphNode ::= VarOrTerm | TriplesNode"""
-        return items[0] if items else None
+        return child
 
-    def graph_node_path(self, items):
+    @v_args(inline=True)
+    def graph_node_path(self, child):
         """[53] GraphNodePath ::= VarOrTerm | TriplesNodePath"""
-        return items[0] if items else None
+        return child
 
     def annotation(self, items):
         """[60] Annotation ::= ( Reifier | AnnotationBlock )*"""
@@ -412,9 +541,10 @@ class SRLTransformer(Transformer):
         # items[0] is the property list - list of (predicate, object) tuples
         return items[0] if items else []
 
-    def path(self, items):
+    @v_args(inline=True)
+    def path(self, child):
         """[47] Path ::= PathSequence"""
-        return items[0]
+        return child
 
     def path_sequence(self, items):
         """[48] PathSequence ::= PathEltOrInverse ( '/' PathEltOrInverse )*"""
@@ -425,30 +555,28 @@ class SRLTransformer(Transformer):
         # Multiple elements = sequence path
         return PathSequence(elements=items)
 
-    def path_elt_or_inverse(self, items):
+    @v_args(inline=True)
+    def path_elt_or_inverse(self, child):
         """[49] PathEltOrInverse ::= PathElt | '^' PathElt"""
-        if not items:
-            return None
-        # Check if this is an inverse path (starts with ^)
-        if len(items) == 2:
-            # First item might be the ^ token
-            first = items[0]
-            if isinstance(first, Token) and str(first) == "^":
-                return InversePath(path=items[1])
-        # Not inverse, return the path element
-        return items[0]
+        return child
+
+    @v_args(inline=True)
+    def inverse_path(self, path):
+        """'^' PathElt"""
+        return InversePath(path=path)
 
-    def path_elt(self, items):
+    @v_args(inline=True)
+    def path_elt(self, child):
         """[50] PathElt ::= PathPrimary"""
-        return items[0]
+        return child
 
     def path_primary(self, items):
         """[51] PathPrimary ::= iri | 'a' | '(' Path ')'"""
+        # The anonymous 'a' keyword is filtered out of the tree, leaving no children
+        if not items:
+            return RDF_TYPE
         if len(items) == 1:
-            item = items[0]
-            if item == "a":
-                return IRI("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
-            return item
+            return items[0]
         
         # Parenthesized path
         for item in items:
@@ -457,30 +585,49 @@ class SRLTransformer(Transformer):
         
         return items[0]
 
-    def prefixed_name(self, items):
+    @v_args(inline=True)
+    def prefixed_name(self, token):
         """[100] PrefixedName ::= PNAME_LN | PNAME_NS"""
-        token = str(items[0])
+        return self._resolve_prefixed_name(str(token))
+
+    def _resolve_prefixed_name(self, token: str) -> IRI:
+        """Expand a prefixed name against the declared prefixes (cached)."""
+        if not self._cache_checked:
+            # Prefixes changed since the cache was filled: keep it only if
+            # they are back to the bindings it was built under.
+            if self._user_prefixes != self._cache_prefixes:
+                self._iri_cache.clear()
+                self._cache_prefixes = dict(self._user_prefixes)
+            self._cache_checked = True
+
+        iri = self._iri_cache.get(token)
+        if iri is not None:
+            return iri
 
         if ":" in token:
             prefix, local = token.split(":", 1)
 
             # Look up prefix in transformer state
-            if prefix in self._prefixes:
-                return IRI(self._prefixes[prefix] + local)
-
-            # Unknown prefix - return as unresolved for error handling
-            # Could raise an error here, but keeping lenient for partial parsing
-            return IRI(f"{prefix}:{local}")
+            namespace = self._prefixes.get(prefix)
+            if namespace is not None:
+                iri = IRI(sys.intern(namespace + local))
+            else:
+                # Unknown prefix - return as unresolved for error handling
+                # Could raise an error here, but keeping lenient for partial parsing
+                iri = IRI(sys.intern(token))
+        else:
+            iri = IRI(sys.intern(token))
 
-        return IRI(token)
+        self._iri_cache[token] = iri
+        return iri
 
     # ========================================================================
     # Terminals and basic types
     # ========================================================================
 
-    def var(self, items):
+    @v_args(inline=True)
+    def var(self, token):
         """[75] Var ::= VAR1 | VAR2"""
-        token = items[0]
         # Remove ? or $ prefix
         name = str(token)[1:]
         return Variable(name=name)
@@ -494,11 +641,7 @@ class SRLTransformer(Transformer):
             if token.startswith("<") and token.endswith(">"):
                 return IRI(token[1:-1])
             # Handle as prefixed name if it contains a colon
-            if ":" in token:
-                prefix, local = token.split(":", 1)
-                if prefix in self._prefixes:
-                    return IRI(self._prefixes[prefix] + local)
-            return IRI(token)
+            return self._resolve_prefixed_name(token)
         return items[0]
 
     def rdf_literal(self, items):
@@ -514,32 +657,32 @@ class SRLTransformer(Transformer):
 
         return Literal(value=value)
 
-    def string(self, items):
+    @v_args(inline=True)
+    def string(self, token):
         """[98] String ::= STRING_LITERAL1 | STRING_LITERAL2 | ..."""
-        token = str(items[0])
-        # Remove quotes
-        if token.startswith('"""') or token.startswith("'''"):
+        token = str(token)
+        # Remove quotes; a short string can only open with three equal
+        # quote characters when it is the empty string ""
+        if len(token) >= 6 and token[0] == token[1] == token[2]:
             return token[3:-3]
         else:
             return token[1:-1]
 
-    def numeric_literal_unsigned(self, items):
+    @v_args(inline=True)
+    def numeric_literal_unsigned(self, token):
         """[94] NumericLiteralUnsigned ::= INTEGER | DECIMAL | DOUBLE"""
-        value = str(items[0])
-        # Determine datatype based on format
-        if "e" in value.lower():
-            datatype = IRI("http://www.w3.org/2001/XMLSchema#double")
-        elif "." in value:
-            datatype = IRI("http://www.w3.org/2001/XMLSchema#decimal")
-        else:
-            datatype = IRI("http://www.w3.org/2001/XMLSchema#integer")
+        # The lexer has already classified the literal by its terminal
+        return Literal(value=str(token), datatype=_NUMERIC_DATATYPES[token.type])
 
-        return Literal(value=value, datatype=datatype)
+    # [95] NumericLiteralPositive, [96] NumericLiteralNegative: the sign is part of the lexical form
+    numeric_literal_positive = numeric_literal_unsigned
+    numeric_literal_negative = numeric_literal_unsigned
 
-    def numeric_literal(self, items):
+    @v_args(inline=True)
+    def numeric_literal(self, literal):
         """[93] NumericLiteral ::= NumericLiteralUnsigned | ..."""
-        # Just return the unsigned literal (items[0] is already transformed)
-        return items[0]
+        # Just return the literal (already transformed)
+        return literal
 
     def boolean_literal(self, items):
         """[97] BooleanLiteral ::= 'true' | 'false'"""
@@ -547,13 +690,7 @@ class SRLTransformer(Transformer):
             value = str(items[0]).lower()
         else:
             value = "true"
-        return Literal(value=value, datatype=IRI("http://www.w3.org/2001/XMLSchema#boolean"))
-
-    def TRUE(self, token):
-        return token
-
-    def FALSE(self, token):
-        return token
+        return Literal(value=value, datatype=XSD_BOOLEAN)
 
     def blank_node(self, items):
         """[101] BlankNode ::= BLANK_NODE_LABEL | ANON"""
@@ -562,50 +699,34 @@ class SRLTransformer(Transformer):
             return BlankNode(label=token[2:])
         else:
             # Generate unique label for anonymous blank node
-            import uuid
-
-            return BlankNode(label=f"anon_{uuid.uuid4().hex[:8]}")
+            if not self._anon_counter:
+                self._anon_prefix = uuid4().hex
+            self._anon_counter += 1
+            return BlankNode(label=f"anon_{self._anon_prefix}_{self._anon_counter}")
 
     # ========================================================================
     # Expressions
     # ========================================================================
 
-    def expression(self, items):
+    @v_args(inline=True)
+    def expression(self, child):
         """[76] Expression ::= ConditionalOrExpression"""
-        return items[0]
+        return child
 
     def conditional_or_expression(self, items):
         """[77] ConditionalOrExpression ::= ConditionalAndExpression ( '||' ConditionalAndExpression )*"""
-        if len(items) == 1:
-            return items[0]
-
         # With named terminals, items are interleaved: expr, OR_OP, expr, OR_OP, expr, ...
-        result = items[0]
-        i = 1
-        while i < len(items):
-            # items[i] is the operator token (OR_OP)
-            right = items[i + 1]
-            result = BinaryOp(operator=BinaryOperator.OR, left=result, right=right)
-            i += 2
-        return result
+        return _left_fold(items, _LOGICAL_OPS)
 
     def conditional_and_expression(self, items):
         """[78] ConditionalAndExpression ::= ValueLogical ( '&&' ValueLogical )*"""
-        if len(items) == 1:
-            return items[0]
-
         # With named terminals, items are interleaved: expr, AND_OP, expr, AND_OP, expr, ...
-        result = items[0]
-        i = 1
-        while i < len(items):
-            right = items[i + 1]
-            result = BinaryOp(operator=BinaryOperator.AND, left=result, right=right)
-            i += 2
-        return result
+        return _left_fold(items, _LOGICAL_OPS)
 
-    def value_logical(self, items):
+    @v_args(inline=True)
+    def value_logical(self, child):
         """[79] ValueLogical ::= RelationalExpression"""
-        return items[0]
+        return child
 
     def relational_expression(self, items):
         """[80] RelationalExpression ::= NumericExpression ( '=' NumericExpression | ... )?"""
@@ -616,136 +737,90 @@ class SRLTransformer(Transformer):
 
         # Comparison: left OP right
         if len(items) == 3:
-            op_token = str(items[1])
+            op_type = items[1].type
             right = items[2]
 
             # IN(...) is represented via the existing built-in dispatch in the engine.
-            if op_token.upper() == "IN":
+            if op_type == "IN_KW":
                 exprs = right if isinstance(right, list) else [right]
                 return BuiltInCall(function_name="IN", arguments=[left, *exprs])
 
-            op_map = {
-                "=": BinaryOperator.EQ,
-                "!=": BinaryOperator.NE,
-                "<": BinaryOperator.LT,
-                ">": BinaryOperator.GT,
-                "<=": BinaryOperator.LE,
-                ">=": BinaryOperator.GE,
-            }
-
-            operator = op_map.get(op_token)
+            operator = _RELATIONAL_OPS.get(op_type)
             if operator is None:
                 return left
             return BinaryOp(operator=operator, left=left, right=right)
 
         # NOT IN (...) -> !(IN(...))
-        if len(items) == 4:
-            not_kw = str(items[1]).upper()
-            in_kw = str(items[2]).upper()
+        if len(items) == 4 and items[1].type == "NOT_KW" and items[2].type == "IN_KW":
             expr_list = items[3]
-
-            if not_kw == "NOT" and in_kw == "IN":
-                exprs = expr_list if isinstance(expr_list, list) else [expr_list]
-                in_call = BuiltInCall(function_name="IN", arguments=[left, *exprs])
-                return UnaryOp(operator=UnaryOperator.NOT, operand=in_call)
+            exprs = expr_list if isinstance(expr_list, list) else [expr_list]
+            in_call = BuiltInCall(function_name="IN", arguments=[left, *exprs])
+            return UnaryOp(operator=UnaryOperator.NOT, operand=in_call)
 
         # Fallback: return the left side if something unexpected is produced.
         return left
 
-    def numeric_expression(self, items):
+    @v_args(inline=True)
+    def numeric_expression(self, child):
         """[81] NumericExpression ::= AdditiveExpression"""
-        return items[0]
+        return child
 
     def additive_expression(self, items):
         """[82] AdditiveExpression ::= MultiplicativeExpression ( '+' | '-' ... )*"""
         if len(items) == 1:
             return items[0]
 
-        # With named terminals, items are interleaved: expr, PLUS_OP|MINUS_OP, expr, ...
+        # Items are interleaved: expr, PLUS_OP|MINUS_OP, expr, ... except that a
+        # signed numeric literal ("?x -2") arrives without an operator token and
+        # may be followed by its own TIMES_OP|DIV_OP operands.
         result = items[0]
         i = 1
-        while i + 1 < len(items):
-            op_token = str(items[i])
-            right = items[i + 1]
-            operator = BinaryOperator.ADD if op_token == "+" else BinaryOperator.SUB
-            result = BinaryOp(operator=operator, left=result, right=right)
-            i += 2
+        n = len(items)
+        while i < n:
+            item = items[i]
+            if isinstance(item, Token):
+                result = BinaryOp(operator=_ADDITIVE_OPS[item.type], left=result, right=items[i + 1])
+                i += 2
+                continue
+
+            term = item
+            i += 1
+            while i < n and isinstance(items[i], Token) and items[i].type in _MULTIPLICATIVE_OPS:
+                term = BinaryOp(
+                    operator=_MULTIPLICATIVE_OPS[items[i].type], left=term, right=items[i + 1]
+                )
+                i += 2
+            result = BinaryOp(operator=BinaryOperator.ADD, left=result, right=term)
 
         return result
 
     def multiplicative_expression(self, items):
         """[83] MultiplicativeExpression ::= UnaryExpression ( '*' | '/' UnaryExpression )*"""
-        if len(items) == 1:
-            return items[0]
-
         # With named terminals, items are interleaved: expr, TIMES_OP|DIV_OP, expr, ...
-        result = items[0]
-        i = 1
-        while i + 1 < len(items):
-            op_token = str(items[i])
-            right = items[i + 1]
-            operator = BinaryOperator.MUL if op_token == "*" else BinaryOperator.DIV
-            result = BinaryOp(operator=operator, left=result, right=right)
-            i += 2
-
-        return result
+        return _left_fold(items, _MULTIPLICATIVE_OPS)
 
     def unary_expression(self, items):
         """[84] UnaryExpression ::= '!' PrimaryExpression | '+' | '-' | PrimaryExpression"""
         if len(items) == 1:
             return items[0]
 
-        op_token = str(items[0])
-        operand = items[1]
-
-        op_map = {
-            "!": UnaryOperator.NOT,
-            "+": UnaryOperator.PLUS,
-            "-": UnaryOperator.MINUS,
-        }
-
-        operator = op_map.get(op_token)
-        return UnaryOp(operator=operator, operand=operand)
+        return UnaryOp(operator=_UNARY_OPS[items[0].type], operand=items[1])
 
-    def primary_expression(self, items):
+    @v_args(inline=True)
+    def primary_expression(self, child):
         """[85] PrimaryExpression ::= BrackettedExpression | BuiltInCall | ..."""
-        return items[0]
+        return child
 
-    def bracketted_expression(self, items):
+    @v_args(inline=True)
+    def bracketted_expression(self, child):
         """[89] BrackettedExpression ::= '(' Expression ')'"""
-        return items[0]
+        return child
 
-    def built_in_call(self, items):
+    @v_args(inline=True)
+    def built_in_call(self, child):
         """[90] BuiltInCall ::= builtin_str | builtin_lang | ..."""
-        # Items contains the result from one of the specific builtin rules
-        return items[0]
-
-    def builtin_str(self, items):
-        return BuiltInCall(function_name="STR", arguments=items)
-
-    def builtin_lang(self, items):
-        return BuiltInCall(function_name="LANG", arguments=items)
-
-    def builtin_langmatches(self, items):
-        return BuiltInCall(function_name="LANGMATCHES", arguments=items)
-
-    def builtin_langdir(self, items):
-        return BuiltInCall(function_name="LANGDIR", arguments=items)
-
-    def builtin_datatype(self, items):
-        return BuiltInCall(function_name="DATATYPE", arguments=items)
-
-    def builtin_bound(self, items):
-        return BuiltInCall(function_name="BOUND", arguments=items)
-
-    def builtin_iri(self, items):
-        return BuiltInCall(function_name="IRI", arguments=items)
-
-    def builtin_uri(self, items):
-        return BuiltInCall(function_name="URI", arguments=items)
-
-    def builtin_bnode(self, items):
-        return BuiltInCall(function_name="BNODE", arguments=items)
+        # The child is the result from one of the specific builtin rules
+        return child
 
     def builtin_concat(self, items):
         # Grammar uses ExpressionList, which is transformed as a single Python list.
@@ -754,161 +829,11 @@ class SRLTransformer(Transformer):
             items = items[0]
         return BuiltInCall(function_name="CONCAT", arguments=items)
     
-    def builtin_rand(self, items):
-        return BuiltInCall(function_name="RAND", arguments=[])
-    
-    def builtin_abs(self, items):
-        return BuiltInCall(function_name="ABS", arguments=items)
-    
-    def builtin_ceil(self, items):
-        return BuiltInCall(function_name="CEIL", arguments=items)
-    
-    def builtin_floor(self, items):
-        return BuiltInCall(function_name="FLOOR", arguments=items)
-    
-    def builtin_round(self, items):
-        return BuiltInCall(function_name="ROUND", arguments=items)
-    
-    def builtin_substr(self, items):
-        return BuiltInCall(function_name="SUBSTR", arguments=items)
-    
-    def builtin_strlen(self, items):
-        return BuiltInCall(function_name="STRLEN", arguments=items)
-    
-    def builtin_replace(self, items):
-        return BuiltInCall(function_name="REPLACE", arguments=items)
-    
-    def builtin_ucase(self, items):
-        return BuiltInCall(function_name="UCASE", arguments=items)
-    
-    def builtin_lcase(self, items):
-        return BuiltInCall(function_name="LCASE", arguments=items)
-    
-    def builtin_encode_for_uri(self, items):
-        return BuiltInCall(function_name="ENCODE_FOR_URI", arguments=items)
-    
-    def builtin_contains(self, items):
-        return BuiltInCall(function_name="CONTAINS", arguments=items)
-    
-    def builtin_strstarts(self, items):
-        return BuiltInCall(function_name="STRSTARTS", arguments=items)
-    
-    def builtin_strends(self, items):
-        return BuiltInCall(function_name="STRENDS", arguments=items)
-    
-    def builtin_strbefore(self, items):
-        return BuiltInCall(function_name="STRBEFORE", arguments=items)
-    
-    def builtin_strafter(self, items):
-        return BuiltInCall(function_name="STRAFTER", arguments=items)
-    
-    def builtin_year(self, items):
-        return BuiltInCall(function_name="YEAR", arguments=items)
-    
-    def builtin_month(self, items):
-        return BuiltInCall(function_name="MONTH", arguments=items)
-    
-    def builtin_day(self, items):
-        return BuiltInCall(function_name="DAY", arguments=items)
-    
-    def builtin_hours(self, items):
-        return BuiltInCall(function_name="HOURS", arguments=items)
-    
-    def builtin_minutes(self, items):
-        return BuiltInCall(function_name="MINUTES", arguments=items)
-    
-    def builtin_seconds(self, items):
-        return BuiltInCall(function_name="SECONDS", arguments=items)
-    
-    def builtin_timezone(self, items):
-        return BuiltInCall(function_name="TIMEZONE", arguments=items)
-    
-    def builtin_tz(self, items):
-        return BuiltInCall(function_name="TZ", arguments=items)
-    
-    def builtin_now(self, items):
-        return BuiltInCall(function_name="NOW", arguments=[])
-    
-    def builtin_uuid(self, items):
-        return BuiltInCall(function_name="UUID", arguments=[])
-    
-    def builtin_struuid(self, items):
-        return BuiltInCall(function_name="STRUUID", arguments=[])
-    
-    def builtin_md5(self, items):
-        return BuiltInCall(function_name="MD5", arguments=items)
-    
-    def builtin_sha1(self, items):
-        return BuiltInCall(function_name="SHA1", arguments=items)
-    
-    def builtin_sha256(self, items):
-        return BuiltInCall(function_name="SHA256", arguments=items)
-    
-    def builtin_sha384(self, items):
-        return BuiltInCall(function_name="SHA384", arguments=items)
-    
-    def builtin_sha512(self, items):
-        return BuiltInCall(function_name="SHA512", arguments=items)
-    
     def builtin_coalesce(self, items):
         if len(items) == 1 and isinstance(items[0], list):
             items = items[0]
         return BuiltInCall(function_name="COALESCE", arguments=items)
     
-    def builtin_if(self, items):
-        return BuiltInCall(function_name="IF", arguments=items)
-    
-    def builtin_strlang(self, items):
-        return BuiltInCall(function_name="STRLANG", arguments=items)
-    
-    def builtin_strlangdir(self, items):
-        return BuiltInCall(function_name="STRLANGDIR", arguments=items)
-    
-    def builtin_strdt(self, items):
-        return BuiltInCall(function_name="STRDT", arguments=items)
-    
-    def builtin_sameterm(self, items):
-        return BuiltInCall(function_name="sameTerm", arguments=items)
-    
-    def builtin_isiri(self, items):
-        return BuiltInCall(function_name="isIRI", arguments=items)
-    
-    def builtin_isuri(self, items):
-        return BuiltInCall(function_name="isURI", arguments=items)
-    
-    def builtin_isblank(self, items):
-        return BuiltInCall(function_name="isBLANK", arguments=items)
-    
-    def builtin_isliteral(self, items):
-        return BuiltInCall(function_name="isLITERAL", arguments=items)
-    
-    def builtin_isnumeric(self, items):
-        return BuiltInCall(function_name="isNUMERIC", arguments=items)
-    
-    def builtin_haslang(self, items):
-        return BuiltInCall(function_name="hasLANG", arguments=items)
-    
-    def builtin_haslangdir(self, items):
-        return BuiltInCall(function_name="hasLANGDIR", arguments=items)
-    
-    def builtin_regex(self, items):
-        return BuiltInCall(function_name="REGEX", arguments=items)
-    
-    def builtin_istriple(self, items):
-        return BuiltInCall(function_name="isTRIPLE", arguments=items)
-    
-    def builtin_triple(self, items):
-        return BuiltInCall(function_name="TRIPLE", arguments=items)
-    
-    def builtin_subject(self, items):
-        return BuiltInCall(function_name="SUBJECT", arguments=items)
-    
-    def builtin_predicate(self, items):
-        return BuiltInCall(function_name="PREDICATE", arguments=items)
-    
-    def builtin_object(self, items):
-        return BuiltInCall(function_name="OBJECT", arguments=items)
-
     def builtin_exists(self, items):
         # items[0] is body_basic (list of patterns)
         return ExistsExpression(patterns=items[0], negated=False)
@@ -928,54 +853,111 @@ class SRLTransformer(Transformer):
         # NIL is a named terminal for "( WS* )"; when present, it arrives as a single Token.
         if len(items) == 1 and isinstance(items[0], Token) and items[0].type == "NIL":
             return []
-        return items if items else []
+        return items
 
     def expression_list(self, items):
         """[33] ExpressionList ::= NIL | '(' Expression ( ',' Expression )* ')'"""
         if len(items) == 1 and isinstance(items[0], Token) and items[0].type == "NIL":
             return []
-        return items if items else []
+        return items
 
     # ========================================================================
     # Misc
     # ========================================================================
 
-    def var_or_term(self, items):
+    @v_args(inline=True)
+    def var_or_term(self, child):
         """[64] VarOrTerm ::= Var | iri | RDFLiteral | ..."""
-        return items[0]
+        return child
 
-    def var_or_iri(self, items):
+    @v_args(inline=True)
+    def var_or_iri(self, child):
         """[74] VarOrIri ::= Var | iri"""
-        return items[0]
+        return child
 
-    # Terminal pass-throughs
+    # Terminals other than IRIREF reach their rules unchanged through
+    # Lark's default __default_token__
     def IRIREF(self, token):
         value = str(token)[1:-1]  # Remove < >
         return IRI(value)
 
-    def VAR1(self, token):
-        return token
-
-    def VAR2(self, token):
-        return token
-
-    def INTEGER(self, token):
-        return token
-
-    def DECIMAL(self, token):
-        return token
 
-    def DOUBLE(self, token):
-        return token
-
-    def STRING_LITERAL1(self, token):
-        return token
-
-    def STRING_LITERAL2(self, token):
-        return token
-
-    def STRING_LITERAL_LONG1(self, token):
-        return token
-
-    def STRING_LITERAL_LONG2(self, token):
-        return token
+def _dedupe_elements(elements):
+    """
+    Drop repeated triple patterns and redundant repeated filters from a rule
+    body, keeping the first occurrence.
+
+    A repeated triple pattern only joins against bindings the first
+    occurrence already fixed. A repeated filter is dropped only if all its
+    variables were bound before the first occurrence, so no element in
+    between can change its result. Filters with EXISTS or a
+    non-deterministic built-in are always kept, as are assignments and
+    negations.
+    """
+    seen = set()
+    # Variables certainly bound after the elements kept so far
+    bound = set()
+    result = []
+    for element in elements:
+        if type(element) is TriplePattern:
+            key = structural_key(element)
+            if key in seen:
+                continue
+            seen.add(key)
+            bound.update(
+                term.name
+                for term in (element.subject, element.predicate, element.object)
+                if type(term) is Variable
+            )
+        elif type(element) is ConditionExpression:
+            variables = _stable_variables(element.expression)
+            if variables is not None and variables <= bound:
+                key = structural_key(element)
+                if key in seen:
+                    continue
+                seen.add(key)
+        elif type(element) is Assignment:
+            bound.add(element.variable.name)
+        result.append(element)
+    return result
+
+
+def _stable_variables(expression):
+    """
+    Names of the variables in an expression, or None if its value can
+    change for the same bindings (EXISTS or a non-deterministic built-in).
+    """
+    names = set()
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is Variable:
+            names.add(node.name)
+        elif node_type is ExistsExpression:
+            return None
+        elif node_type is BuiltInCall and node.function_name in _NONDETERMINISTIC_BUILTINS:
+            return None
+        elif node_type is list:
+            stack.extend(node)
+        else:
+            stack.extend(getattr(node, name) for name in getattr(node_type, "_fields", ()))
+    return names
+
+
+def _builtin_method(function_name: str, nullary: bool):
+    """Create the transformer method for a table-driven built-in call."""
+    if nullary:
+        def method(self, items):
+            return BuiltInCall(function_name=function_name, arguments=[])
+    else:
+        def method(self, items):
+            return BuiltInCall(function_name=function_name, arguments=items)
+    return method
+
+
+for _rule, _function_name in _BUILTIN_FUNCTIONS.items():
+    setattr(SRLTransformer, _rule, _builtin_method(_function_name, nullary=False))
+for _rule, _function_name in _NULLARY_BUILTIN_FUNCTIONS.items():
+    setattr(SRLTransformer, _rule, _builtin_method(_function_name, nullary=True))
+del _rule, _function_name
@@ -8,6 +8,15 @@ from typing import Dict, Optional
 
 from rdflib import Namespace as RDFLibNamespace
 
+# Key marking a complete namespace in the abbreviation trie; never a character
+_TRIE_END = None
+
+# Abbreviations remembered per manager before the memo is emptied
+_ABBREVIATION_CACHE_SIZE = 4096
+
+# Characters a local name may not contain for the split lookup to apply
+_SPLIT_CHARS = "#/:"
+
 
 class NamespaceManager:
     """
@@ -23,6 +32,16 @@ class NamespaceManager:
         """Initialize with common prefixes."""
         self._prefixes: Dict[str, str] = {}
         self._namespaces: Dict[str, RDFLibNamespace] = {}
+        # Reverse index for abbreviation: namespace -> prefix, plus a
+        # character trie over the namespaces for longest-match lookups
+        self._ns_to_prefix: Dict[str, str] = {}
+        self._trie: dict = {}
+        # Whether every namespace ends in a split character, which makes the
+        # namespace ending at an IRI's last split character its longest match
+        self._split_namespaces = True
+        # Memo of abbreviate(); a plain dict keeps the manager free of the
+        # reference cycle an lru_cache over a bound method would create
+        self._abbreviations: Dict[str, Optional[str]] = {}
         
         # Register common prefixes
         self.register("rdf", "http://www.w3.org/1999/02/22-rdf-syntax-ns#")
@@ -40,6 +59,29 @@ class NamespaceManager:
         """
         self._prefixes[prefix] = namespace
         self._namespaces[prefix] = RDFLibNamespace(namespace)
+        self._rebuild_index()
+    
+    def _rebuild_index(self) -> None:
+        """Rebuild the abbreviation index after the prefix table changed."""
+        ns_to_prefix: Dict[str, str] = {}
+        for prefix, namespace in self._prefixes.items():
+            # The first prefix registered for a namespace wins
+            ns_to_prefix.setdefault(namespace, prefix)
+        
+        trie: dict = {}
+        for namespace, prefix in ns_to_prefix.items():
+            node = trie
+            for char in namespace:
+                node = node.setdefault(char, {})
+            node[_TRIE_END] = prefix
+        
+        self._ns_to_prefix = ns_to_prefix
+        self._trie = trie
+        self._split_namespaces = all(
+            namespace and namespace[-1] in _SPLIT_CHARS for namespace in ns_to_prefix
+        )
+        # Abbreviations computed against the old prefix table are stale
+        self._abbreviations.clear()
     
     def expand(self, prefixed_name: str) -> Optional[str]:
         """
@@ -51,13 +93,13 @@ class NamespaceManager:
         Returns:
             Full IRI or None if prefix not found
         """
-        if ":" not in prefixed_name:
+        prefix, colon, local_name = prefixed_name.partition(":")
+        if not colon:
             return None
         
-        prefix, local_name = prefixed_name.split(":", 1)
-        
-        if prefix in self._prefixes:
-            return self._prefixes[prefix] + local_name
+        namespace = self._prefixes.get(prefix)
+        if namespace is not None:
+            return namespace + local_name
         
         return None
     
@@ -65,18 +107,48 @@ class NamespaceManager:
         """
         Abbreviate a full IRI to prefixed name.
         
+        Uses the longest registered namespace that is a proper prefix of the
+        IRI, so the local name is never empty. When every namespace ends in
+        '#', '/' or ':', the namespace ending at the IRI's last such character
+        is looked up directly before walking the trie.
+        
         Args:
             iri: Full IRI
         
         Returns:
             Prefixed name or None if no matching prefix
         """
-        for prefix, namespace in self._prefixes.items():
-            if iri.startswith(namespace):
-                local_name = iri[len(namespace):]
-                return f"{prefix}:{local_name}"
+        # Workloads repeat the same IRIs (rdf:type, rdfs:label, ...) heavily
+        if iri in self._abbreviations:
+            return self._abbreviations[iri]
+        if len(self._abbreviations) >= _ABBREVIATION_CACHE_SIZE:
+            self._abbreviations.clear()
+        abbreviation = self._abbreviations[iri] = self._abbreviate(iri)
+        return abbreviation
+    
+    def _abbreviate(self, iri: str) -> Optional[str]:
+        if self._split_namespaces:
+            split = max(iri.rfind("#"), iri.rfind("/"), iri.rfind(":")) + 1
+            if 0 < split < len(iri):
+                prefix = self._ns_to_prefix.get(iri[:split])
+                if prefix is not None:
+                    return f"{prefix}:{iri[split:]}"
         
-        return None
+        node = self._trie
+        prefix = node.get(_TRIE_END) if iri else None
+        end = 0
+        # The last character is never consumed, leaving a non-empty local name
+        for i, char in enumerate(iri[:-1], 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if _TRIE_END in node:
+                prefix = node[_TRIE_END]
+                end = i
+        
+        if prefix is None:
+            return None
+        return f"{prefix}:{iri[end:]}"
     
     def get_namespace(self, prefix: str) -> Optional[RDFLibNamespace]:
         """
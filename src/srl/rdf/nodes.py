@@ -4,6 +4,8 @@ RDF node types (IRI, Literal, BlankNode).
 Provides typed wrappers around rdflib node types.
 """
 
+import sys
+from functools import lru_cache
 from typing import Union, Optional
 
 from rdflib import URIRef, Literal as RDFLibLiteral, BNode
@@ -12,6 +14,18 @@ from rdflib import URIRef, Literal as RDFLibLiteral, BNode
 RDFNode = Union[URIRef, RDFLibLiteral, BNode]
 
 
+@lru_cache(maxsize=8192)
+def _uriref(iri: str) -> URIRef:
+    """
+    Shared URIRef for an IRI string.
+
+    The same IRIs recur constantly (rdf:type, common predicates and
+    datatypes); reusing one URIRef per IRI keeps its string hash cached and
+    lets equality checks succeed on identity.
+    """
+    return URIRef(iri)
+
+
 class IRINode:
     """
     Wrapper for IRI/URI nodes.
@@ -24,7 +38,7 @@ class IRINode:
         Args:
             iri: IRI string
         """
-        self.value = URIRef(iri)
+        self.value = _uriref(iri)
     
     def __str__(self) -> str:
         return f"<{self.value}>"
@@ -61,9 +75,9 @@ class LiteralNode:
             language: Optional language tag
         """
         if datatype:
-            self.value = RDFLibLiteral(value, datatype=URIRef(datatype))
+            self.value = RDFLibLiteral(value, datatype=_uriref(datatype))
         elif language:
-            self.value = RDFLibLiteral(value, lang=language)
+            self.value = RDFLibLiteral(value, lang=sys.intern(language))
         else:
             self.value = RDFLibLiteral(value)
     
@@ -1,9 +1,14 @@
 """
 Test producing both results only and combined results & data
 """
+from pathlib import Path
+
 from rdflib import Graph
+from rdflib.compare import isomorphic
 import pytest
-from src.srl.engine import RuleEngine
+from src.srl.ast.nodes import ConditionExpression
+from src.srl.engine import RuleEngine, engine as engine_module
+from src.srl.engine.rules import eval_transitive_closure, order_body_elements
 from src.srl.parser import SRLParser
 
 
@@ -86,3 +91,179 @@ def test_results_without_data():
     o3 = rule_engine(r).evaluate(d, inplace=False, results_only=True)
 
     assert len(o3) == 3  # inferred only
+
+
+def test_recursive_rule_reaches_full_closure():
+    """Rounds after the first only join through new triples yet still reach the closure."""
+    r = """
+        PREFIX : <http://example.org/>
+
+        RULE { ?x :ancestor ?y } WHERE { ?x :parent ?y }
+        RULE { ?x :ancestor ?z } WHERE { ?x :parent ?y . ?y :ancestor ?z }
+        RULE { ?x :elder ?z } WHERE { ?x :ancestor ?z FILTER(?x != ?z) }
+        """
+    n = 20
+    d = Graph().parse(
+        data="PREFIX : <http://example.org/>\n"
+        + "\n".join(f":p{i} :parent :p{i + 1} ." for i in range(n - 1)),
+        format="turtle",
+    )
+    o = rule_engine(r).evaluate(d, inplace=False, results_only=True)
+
+    assert len(o) == n * (n - 1)  # ancestor and elder pairs
+
+
+def spy_body_evaluations(monkeypatch):
+    """Record the rules whose bodies the engine evaluates, and how."""
+    calls = []
+    for name, kind in (("eval_rule", "full"), ("eval_rule_delta", "delta")):
+        original = getattr(engine_module, name)
+
+        def spy(rule, *args, original=original, kind=kind):
+            calls.append((kind, rule))
+            return original(rule, *args)
+
+        monkeypatch.setattr(engine_module, name, spy)
+    return calls
+
+
+def test_rules_with_equal_bodies_share_solutions(monkeypatch):
+    """Rules whose bodies are equal each instantiate their own head from one evaluation."""
+    r = """
+        PREFIX : <http://example.org/>
+
+        RULE { ?x :q ?y } WHERE { ?x :p ?y }
+        RULE { ?y :r ?x } WHERE { ?x :p ?y }
+        """
+    d = Graph().parse(data="PREFIX : <http://example.org/>\n:a :p :b .", format="turtle")
+    calls = spy_body_evaluations(monkeypatch)
+    o = rule_engine(r).evaluate(d, inplace=False, results_only=True)
+
+    assert set(o) == set(
+        Graph().parse(
+            data="PREFIX : <http://example.org/>\n:a :q :b . :b :r :a .", format="turtle"
+        )
+    )
+    # One evaluation of the shared body per fixpoint iteration
+    assert [kind for kind, _ in calls] == ["full", "delta"]
+
+
+def test_body_ordered_by_cardinality_with_filter_hoisted():
+    """Selective patterns go first and a filter follows the pattern binding its variable."""
+    r = """
+        PREFIX : <http://example.org/>
+
+        RULE { ?x :adult true } WHERE { ?x :knows ?y . ?x :age ?a . FILTER(?a >= 18) }
+        """
+    d = Graph().parse(
+        data="PREFIX : <http://example.org/>\n"
+        + "\n".join(f":p{i} :knows :p{i + 1} ." for i in range(10))
+        + "\n:p0 :age 30 . :p1 :age 12 .",
+        format="turtle",
+    )
+    rule = SRLParser().parse(r).rules[0]
+    ordered = order_body_elements(rule.body.elements, d)
+
+    assert [str(e.predicate) for e in ordered if not isinstance(e, ConditionExpression)] == [
+        "<http://example.org/age>",
+        "<http://example.org/knows>",
+    ]
+    assert isinstance(ordered[1], ConditionExpression)
+    assert len(rule_engine(r).evaluate(d, inplace=False, results_only=True)) == 1
+
+
+def test_transitive_rule_matches_generic_evaluation(monkeypatch):
+    """The closure shortcut for a transitivity rule infers what plain evaluation does."""
+    rules = """
+        PREFIX : <http://example.org/>
+
+        RULE {{ ?x :reach ?y }} WHERE {{ ?x :edge ?y }}
+        RULE {{ ?x :reach ?z }} WHERE {{ ?x :reach ?y . ?y :reach ?z {filter} }}
+        """
+    edges = [(0, 1), (1, 2), (2, 0), (2, 3), (4, 5), (5, 6), (3, 7), (7, 7), (8, 4)]
+    d = Graph().parse(
+        data="PREFIX : <http://example.org/>\n"
+        + "\n".join(f":n{a} :edge :n{b} ." for a, b in edges),
+        format="turtle",
+    )
+    generic = rule_engine(rules.format(filter="FILTER(BOUND(?y))")).evaluate(
+        d, inplace=False, results_only=True
+    )
+    calls = spy_body_evaluations(monkeypatch)
+    closures = []
+    monkeypatch.setattr(
+        engine_module,
+        "eval_transitive_closure",
+        lambda *args: closures.append(args) or eval_transitive_closure(*args),
+    )
+    shortcut = rule_engine(rules.format(filter="")).evaluate(d, inplace=False, results_only=True)
+
+    # Only the :edge rule's body is evaluated; the transitivity rule is a closure
+    assert closures
+    assert {len(rule.body.elements) for _, rule in calls} == {1}
+    assert set(shortcut) == set(generic)
+    assert len(shortcut) == 23  # :reach pairs of the closure
+
+
+def test_bitset_closure_matches_search():
+    """The bitset closure agrees with the search used for deltas, cycles included."""
+    edges = [(0, 1), (1, 2), (2, 0), (2, 3), (4, 5), (5, 6), (3, 7), (7, 7), (8, 4), (6, 3)]
+    d = Graph().parse(
+        data="PREFIX : <http://example.org/>\n"
+        + "\n".join(f":n{a} :edge :n{b} ." for a, b in edges),
+        format="turtle",
+    )
+    edge = next(iter(d.predicates()))
+
+    # Passing the whole graph as delta searches from every subject
+    closure = eval_transitive_closure(d, edge)
+    assert closure == eval_transitive_closure(d, edge, delta=d)
+    assert len(closure) == 31
+
+
+TEST_CASES = Path(__file__).parent / "test-cases"
+OXIGRAPH_EXAMPLES = [
+    TEST_CASES / "basic-inference" / "basic-inference-002.srl",
+    TEST_CASES / "transitive" / "transitive-001.srl",
+    TEST_CASES / "negation" / "negation-002.srl",
+    TEST_CASES / "exists-patterns" / "exists-patterns-002.srl",
+    TEST_CASES / "aggregation" / "aggregation-001.srl",
+    TEST_CASES / "hash-functions" / "hash-functions-002.srl",
+]
+
+
+@pytest.mark.parametrize("srl_path", OXIGRAPH_EXAMPLES, ids=lambda path: path.stem)
+def test_oxigraph_copy_matches_default_store(srl_path):
+    """Evaluating on an Oxigraph working copy infers what the default store does."""
+    oxrdflib = pytest.importorskip("oxrdflib")
+    text = srl_path.read_text(encoding="utf-8")
+    rule_set = SRLParser().parse(text)
+    data = Graph().parse(srl_path.with_suffix(".ttl"), format="turtle")
+    in_memory = Graph()
+    in_memory += data
+
+    RuleEngine(rule_set).evaluate(in_memory, inplace=True)
+    copied = RuleEngine(rule_set, store="Oxigraph").evaluate(data, inplace=False)
+
+    assert isinstance(copied.store, oxrdflib.OxigraphStore)
+    assert len(data) < len(in_memory)
+    if "UUID" in text:
+        # Generated values differ between runs, so only the sizes can match
+        assert len(copied) == len(in_memory)
+    else:
+        assert isomorphic(copied, in_memory)
+
+
+def test_copy_uses_default_store_unless_asked():
+    """inplace=False copies onto the default memory store unless a store is named."""
+    r = """
+        PREFIX : <http://example.org/>
+
+        RULE { ?x :q ?y } WHERE { ?x :p ?y }
+        """
+    d = Graph().parse(data="PREFIX : <http://example.org/>\n:a :p :b .", format="turtle")
+    o = rule_engine(r).evaluate(d, inplace=False)
+
+    assert type(o.store) is type(d.store)
+    assert len(o) == 2
+    assert len(d) == 1
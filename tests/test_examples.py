@@ -3,17 +3,28 @@ Test runner for SRL examples defined in EXAMPLES.md.
 """
 
 import logging
-import os
 import pytest
+from dataclasses import dataclass
 from pathlib import Path
-from rdflib import Graph, Namespace
+from typing import Tuple
+from rdflib import Graph, Namespace, URIRef
 
 from srl.engine import RuleEngine
 from srl.parser import SRLParser
-from srl.ast.nodes import IRI, Variable
+from srl.ast.nodes import IRI
 
 logger = logging.getLogger(__name__)
 
+EX = Namespace("http://example.org/")
+
+# Predicates a result must contain when the case's description mentions them
+KEYWORD_PREDICATES = [
+    (("childof",), EX.childOf),
+    (("sibling",), EX.siblingOf),
+    (("ancestor",), EX.ancestorOf),
+    (("full name", "fullname"), EX.fullName),
+]
+
 # Define test cases from EXAMPLES.md
 # Format: (id, category, description, srl_file, ttl_file, status)
 EXAMPLES = [
@@ -68,43 +79,70 @@ def extract_head_predicates(rule_set):
             # We ignore variable predicates for now as they are harder to check
     return predicates
 
-@pytest.mark.parametrize("id, category, description, srl_file, ttl_file, status", EXAMPLES)
-def test_example_case(id, category, description, srl_file, ttl_file, status):
+@dataclass(frozen=True, slots=True)
+class ExampleCase:
+    """An EXAMPLES entry with its file paths and keyword checks resolved."""
+
+    id: str
+    description: str
+    srl_path: Path
+    ttl_path: Path
+    status: str
+    # Predicates the result must contain, picked from the description
+    checks: Tuple[URIRef, ...]
+
+def prepare_example(id, category, description, srl_file, ttl_file, status):
+    """Resolve an EXAMPLES entry once, at collection time."""
+    base_dir = get_test_cases_dir()
+    desc_lower = description.lower()
+    checks = tuple(
+        predicate
+        for phrases, predicate in KEYWORD_PREDICATES
+        if any(phrase in desc_lower for phrase in phrases)
+    )
+    return ExampleCase(id, description, base_dir / srl_file, base_dir / ttl_file, status, checks)
+
+CASES = tuple(prepare_example(*example) for example in EXAMPLES)
+
+@pytest.mark.parametrize("case", CASES, ids=[case.id for case in CASES])
+def test_example_case(case):
     """Run a single example test case."""
     
-    if status == "FAIL":
-        pytest.xfail(f"Test case {id} is marked as FAIL")
+    if case.status == "FAIL":
+        pytest.xfail(f"Test case {case.id} is marked as FAIL")
 
-    base_dir = get_test_cases_dir()
-    srl_path = base_dir / srl_file
-    ttl_path = base_dir / ttl_file
+    srl_path = case.srl_path
+    ttl_path = case.ttl_path
 
-    if not srl_path.exists():
+    # Read the rules up front instead of checking for the file first
+    try:
+        srl_text = srl_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
         pytest.fail(f"SRL file not found: {srl_path}")
     
     # TTL file is optional according to EXAMPLES.md, but all listed have one.
     # If missing, we start with empty graph.
     data_graph = Graph()
-    if ttl_path.exists():
+    try:
+        ttl_data = ttl_path.read_bytes()
+    except FileNotFoundError:
+        ttl_data = None
+    if ttl_data is not None:
         try:
-            data_graph.parse(str(ttl_path), format="turtle")
+            data_graph.parse(data=ttl_data, format="turtle")
         except Exception as e:
             pytest.fail(f"Failed to parse TTL file {ttl_path}: {e}")
     
-    logger.info(f"Running test case: {id} - {description}")
+    logger.info(f"Running test case: {case.id} - {case.description}")
     logger.info(f"Input graph size: {len(data_graph)}")
 
     # Parse SRL
     parser = SRLParser()
     try:
-        rule_set = parser.parse(srl_path.read_text(encoding="utf-8"))
+        rule_set = parser.parse(srl_text)
     except Exception as e:
         pytest.fail(f"Failed to parse SRL file {srl_path}: {e}")
 
-    # Extract expected predicates from rule heads
-    expected_predicates = extract_head_predicates(rule_set)
-    logger.info(f"Expected head predicates: {expected_predicates}")
-
     # Run Engine
     engine = RuleEngine(rule_set)
     try:
@@ -113,45 +151,41 @@ def test_example_case(id, category, description, srl_file, ttl_file, status):
         pytest.fail(f"Rule evaluation failed: {e}")
 
     logger.info(f"Result graph size: {len(result_graph)}")
-    
+
+    # Extract expected predicates from rule heads
+    expected_predicates = extract_head_predicates(rule_set)
+    logger.info(f"Expected head predicates: {expected_predicates}")
+
     # Verification: Check if any new triples were inferred
     # Or at least check if triples with head predicates exist in the result
-    
+
     if not expected_predicates:
         logger.warning("No explicit IRI predicates found in rule heads (maybe variables?). Skipping predicate check.")
     else:
-        found_predicate = False
-        for s, p, o in result_graph:
-            if str(p) in expected_predicates:
-                found_predicate = True
-                break
-        
-        if not found_predicate:
-            # It's possible that rules didn't fire because data didn't match, 
+        # Each head predicate is a single lookup in the store's predicate index
+        found_predicate = any(
+            next(result_graph.triples((None, URIRef(p), None)), None) is not None
+            for p in expected_predicates
+        )
+
+        if not found_predicate and logger.isEnabledFor(logging.WARNING):
+            # It's possible that rules didn't fire because data didn't match,
             # but for these examples, we generally expect them to do something.
             # However, failing the test might be too strict if the example is subtle.
             # Let's log a warning instead of failing, unless we want strict verification.
             # Given the user asked to "figure out expected results", ensuring output contains
             # the target predicate is a reasonable "expected result".
-            
+
             # Let's check if the input graph already had them (maybe no *new* inference, but predicate exists)
             # The check above looks at result_graph, which includes input.
-            
+
             logger.warning(f"No triples found with expected head predicates: {expected_predicates}")
-            # pytest.fail(f"No triples found with expected head predicates: {expected_predicates}") 
+            # pytest.fail(f"No triples found with expected head predicates: {expected_predicates}")
             # Commented out fail to be safe, but logged warning.
 
     # Check for specific expectations based on description keywords
     # This is a heuristic to "figure out expected results"
-    desc_lower = description.lower()
-    
-    if "childof" in desc_lower:
-        assert any("childOf" in str(p) for _, p, _ in result_graph), "Expected 'childOf' predicate in result"
-    if "sibling" in desc_lower:
-        assert any("sibling" in str(p) for _, p, _ in result_graph), "Expected 'sibling' predicate in result"
-    if "ancestor" in desc_lower:
-        assert any("ancestor" in str(p) for _, p, _ in result_graph), "Expected 'ancestor' predicate in result"
-    if "full name" in desc_lower or "fullname" in desc_lower:
-        assert any("fullName" in str(p) for _, p, _ in result_graph), "Expected 'fullName' predicate in result"
+    for predicate in case.checks:
+        assert (None, predicate, None) in result_graph, f"Expected '{predicate}' predicate in result"
     
-    logger.info(f"Test case {id} passed.")
+    logger.info(f"Test case {case.id} passed.")
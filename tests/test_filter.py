@@ -3,7 +3,15 @@
 import logging
 from rdflib import Graph, Namespace, Literal
 
+from srl.ast.nodes import BinaryOp, BinaryOperator, IRI, Literal as LiteralNode, Variable
 from srl.engine import RuleEngine
+from srl.engine.expressions import (
+    compile_expr,
+    effective_boolean_value,
+    eval_expr,
+    numeric_comparison_filter,
+)
+from srl.engine.solutions import SolutionMapping
 from srl.parser import SRLParser
 
 logger = logging.getLogger(__name__)
@@ -47,3 +55,46 @@ def test_filter_evaluation():
     assert (EX.Bob, EX.isAdult, Literal(True)) not in result
     
     logger.info("Filter evaluation test passed.")
+
+
+def test_numeric_comparison_filter_matches_generic_evaluation():
+    """The specialised ?var OP constant filter agrees with eval_expr."""
+    eighteen = LiteralNode("18", datatype=IRI("http://www.w3.org/2001/XMLSchema#integer"))
+    bindings = [Literal(17), Literal(18), Literal(18.5), Literal("abc"), EX.Alice]
+    for op in (BinaryOperator.LT, BinaryOperator.LE, BinaryOperator.GT, BinaryOperator.GE):
+        for expr in (BinaryOp(op, Variable("age"), eighteen), BinaryOp(op, eighteen, Variable("age"))):
+            test = numeric_comparison_filter(expr)
+            assert test is not None
+            for value in bindings:
+                mu = SolutionMapping({"age": value})
+                assert test(mu) == effective_boolean_value(eval_expr(expr, mu))
+            assert test(SolutionMapping()) is False
+
+    assert numeric_comparison_filter(BinaryOp(BinaryOperator.EQ, Variable("age"), eighteen)) is None
+
+
+def test_compiled_expressions_match_eval_expr():
+    """compile_expr evaluates to the same terms as eval_expr."""
+    filters = [
+        "?a + 2 > ?b || !(?c = \"x\")",
+        "CONCAT(STR(?c), \"-\", LCASE(?d)) = \"x-y\"",
+        "IF(?a > 1, ?b, ?c)",
+        "-?a * 2 <= ?b && ?z < 3",
+        "STRLEN(?d) / 0",
+        "CONCAT(?c, \" \", ?d, 42) = \"x Y42\"",
+        "CONCAT(?a, ?b, ?z)",
+    ]
+    rule_set = SRLParser().parse(
+        "PREFIX ex: <http://example.org/>\n"
+        + "\n".join(f"RULE {{ ?a ex:p ?b }} WHERE {{ ?a ex:p ?b FILTER({f}) }}" for f in filters)
+    )
+    mappings = [
+        SolutionMapping({"a": Literal(3), "b": Literal(4.5), "c": Literal("x"), "d": Literal("Y")}),
+        SolutionMapping({"a": Literal(1), "b": EX.b, "c": Literal("q"), "z": Literal("z")}),
+        SolutionMapping(),
+    ]
+    for rule in rule_set.rules:
+        expr = rule.body.elements[-1].expression
+        compiled = compile_expr(expr)
+        for mu in mappings:
+            assert compiled(mu) == eval_expr(expr, mu)
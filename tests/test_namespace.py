@@ -0,0 +1,64 @@
+"""Test prefix expansion and abbreviation."""
+
+import weakref
+
+from srl.rdf import NamespaceManager
+
+
+def test_abbreviate_prefers_longest_namespace():
+    """Abbreviation picks the longest registered namespace, with or without a split char."""
+    manager = NamespaceManager()
+    manager.register("ex", "http://example.org/")
+    manager.register("exa", "http://example.org/a/")
+    manager.register("urn", "urn:x-")
+
+    assert manager.abbreviate("http://www.w3.org/1999/02/22-rdf-syntax-ns#type") == "rdf:type"
+    assert manager.abbreviate("http://example.org/a/b") == "exa:b"
+    assert manager.abbreviate("http://example.org/a/b/c") == "exa:b/c"
+    assert manager.abbreviate("urn:x-thing") == "urn:thing"
+    assert manager.abbreviate("http://unknown.org/x") is None
+
+
+def test_abbreviate_prefers_namespace_past_last_split_char():
+    """A namespace extending past the IRI's last split char still wins when longer."""
+    manager = NamespaceManager()
+    manager.register("ex", "http://ex.org/")
+    manager.register("exa", "http://ex.org/a")
+
+    assert manager.abbreviate("http://ex.org/abc") == "exa:bc"
+    assert manager.abbreviate("http://ex.org/b") == "ex:b"
+
+
+def test_abbreviate_never_leaves_empty_local_name():
+    """An IRI equal to a namespace falls back to a shorter namespace or None."""
+    manager = NamespaceManager()
+    manager.register("ex", "http://ex.org/")
+    manager.register("exa", "http://ex.org/a")
+
+    assert manager.abbreviate("http://ex.org/a") == "ex:a"
+    assert manager.abbreviate("http://ex.org/") is None
+    assert manager.abbreviate("") is None
+    assert NamespaceManager().abbreviate("http://www.w3.org/ns/shacl#") is None
+
+
+def test_reregistered_prefix_is_abbreviated_to_new_namespace():
+    """Re-registering a prefix drops its old namespace from abbreviation."""
+    manager = NamespaceManager()
+    manager.register("ex", "http://example.org/old/")
+    assert manager.abbreviate("http://example.org/old/x") == "ex:x"
+    manager.register("ex", "http://example.org/new/")
+
+    assert manager.abbreviate("http://example.org/old/x") is None
+    assert manager.abbreviate("http://example.org/new/x") == "ex:x"
+    assert manager.expand("ex:x") == "http://example.org/new/x"
+
+
+def test_abbreviating_manager_is_freed_without_gc():
+    """The abbreviation memo does not keep its manager alive in a cycle."""
+    manager = NamespaceManager()
+    assert manager.abbreviate("http://www.w3.org/2000/01/rdf-schema#label") == "rdfs:label"
+    ref = weakref.ref(manager)
+
+    del manager
+
+    assert ref() is None
@@ -0,0 +1,23 @@
+"""Test AST node construction."""
+
+from dataclasses import FrozenInstanceError, MISSING, fields
+
+import pytest
+
+from srl.ast.nodes import _STRUCTURAL_NODES
+
+
+@pytest.mark.parametrize("cls", _STRUCTURAL_NODES, ids=lambda cls: cls.__name__)
+def test_nodes_apply_defaults_and_cache_fields(cls):
+    """Every structural node takes its fields positionally, fills in defaults and stays frozen."""
+    node_fields = fields(cls)
+    required = [f for f in node_fields if f.default is MISSING]
+    node = cls(*(f"value-{f.name}" for f in required))
+
+    for f in node_fields:
+        expected = f"value-{f.name}" if f.default is MISSING else f.default
+        assert getattr(node, f.name) == expected
+    assert cls._fields == tuple(f.name for f in node_fields)
+    if node_fields:
+        with pytest.raises(FrozenInstanceError):
+            setattr(node, node_fields[0].name, None)
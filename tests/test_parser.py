@@ -31,3 +31,139 @@ def test_basic_parser_structure():
     assert len(rule.body.elements) == 1
     
     logger.info("Basic parser structure test passed.")
+
+
+def test_parse_files_in_parallel():
+    """Parsing several files in worker processes matches parsing them one by one."""
+    from pathlib import Path
+
+    paths = sorted(str(p) for p in Path(__file__).parent.glob("test-cases/**/*.srl"))[:4]
+    parser = SRLParser()
+    sequential = [parser.parse_file(path) for path in paths]
+    parallel = parser.parse_files(paths, max_workers=2)
+
+    assert [len(rs.rules) for rs in parallel] == [len(rs.rules) for rs in sequential]
+    logger.info("Parallel parse_files test passed.")
+
+
+def test_signed_literal_in_additive_expression():
+    """A signed literal after an operand is added, binding tighter than the addition."""
+    from srl.ast.nodes import BinaryOp, BinaryOperator
+
+    parser = SRLParser()
+    result = parser.parse(
+        "PREFIX : <http://example.org/>\n"
+        "RULE { ?x :p ?y } WHERE { ?x :q ?v BIND(?v -2 * 3 AS ?y) }"
+    )
+    expr = result.rules[0].body.elements[1].expression
+
+    assert isinstance(expr, BinaryOp) and expr.operator == BinaryOperator.ADD
+    assert expr.right.operator == BinaryOperator.MUL
+    assert expr.right.left.value == "-2"
+
+
+def test_a_keyword_is_rdf_type():
+    """The 'a' keyword abbreviates rdf:type in both templates and path patterns."""
+    parser = SRLParser()
+    result = parser.parse(
+        "PREFIX : <http://example.org/>\n"
+        "RULE { ?x a :C } WHERE { ?x a :D }"
+    )
+    rule = result.rules[0]
+    rdf_type = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+    assert rule.head.templates[0].predicate.value == rdf_type
+    assert rule.body.elements[0].predicate.value == rdf_type
+
+
+def test_prefixes_do_not_leak_between_parses():
+    """A prefix declared in one document is unknown to the next one."""
+    parser = SRLParser()
+    first = parser.parse(
+        "PREFIX : <http://example.org/a#>\n"
+        "RULE { ?x :p ?y } WHERE { ?x :q ?y }"
+    )
+    second = parser.parse(
+        "PREFIX : <http://example.org/b#>\n"
+        "RULE { ?x :p ?y } WHERE { ?x :q ?y }"
+    )
+
+    assert first.rules[0].head.templates[0].predicate.value == "http://example.org/a#p"
+    assert second.rules[0].head.templates[0].predicate.value == "http://example.org/b#p"
+
+
+def test_repeated_prefixes_share_resolved_names():
+    """Documents declaring the same prefixes resolve to the same IRI objects."""
+    prefix = "PREFIX : <http://example.org/shared#>\n"
+    first = SRLParser().parse(prefix + "RULE { ?x :p ?y } WHERE { ?x :q ?y }")
+    second = SRLParser().parse(prefix + "RULE { ?x :p ?z } WHERE { ?x :r ?z }")
+    other = SRLParser().parse(
+        "PREFIX : <http://example.org/other#>\nRULE { ?x :p ?y } WHERE { ?x :q ?y }"
+    )
+
+    predicate = first.rules[0].head.templates[0].predicate
+    assert second.rules[0].head.templates[0].predicate is predicate
+    assert other.rules[0].head.templates[0].predicate.value == "http://example.org/other#p"
+
+
+def test_anonymous_blank_nodes_differ_between_parses():
+    """Anonymous blank nodes of separately parsed rule sets never share a label."""
+    parser = SRLParser()
+    first = parser.parse("PREFIX : <http://example.org/>\nRULE { [] :p ?y } WHERE { ?x :q ?y }")
+    second = parser.parse("PREFIX : <http://example.org/>\nRULE { [] :r ?y } WHERE { ?x :q ?y }")
+
+    first_node = first.rules[0].head.templates[0].subject
+    second_node = second.rules[0].head.templates[0].subject
+    assert first_node.label != second_node.label
+
+
+def test_parse_reuses_cached_rule_set():
+    """Parsing identical text twice, up to surrounding whitespace, reuses the cached AST."""
+    text = "PREFIX : <http://example.org/cache#>\nRULE { ?x :p ?y } WHERE { ?x :q ?y }"
+    first = SRLParser().parse(text)
+    body = first.rules[0].body
+
+    assert SRLParser().parse(text).rules[0].body is body
+    assert SRLParser().parse("\n" + text + "\n").rules[0].body is body
+    assert SRLParser().parse(text.replace("?y }", "?y  }")).rules[0].body is not body
+
+
+def test_cached_rule_set_is_copied_per_caller():
+    """Changes a caller makes to a parsed RuleSet do not reach later parses."""
+    text = "PREFIX : <http://example.org/copy#>\nRULE { ?x :p ?y } WHERE { ?x :q ?y }"
+    first = SRLParser().parse(text)
+    first.rules.append(first.rules[0])
+    first.rules[0].layer = 3
+    first.prologue.prefixes.clear()
+
+    second = SRLParser().parse(text)
+    assert second == SRLParser().parse(text)
+    assert len(second.rules) == 1
+    assert second.rules[0].layer is None
+    assert second.prologue.prefixes
+
+
+def test_duplicate_body_patterns_are_dropped():
+    """Repeated triple patterns and filters in a rule body are parsed once."""
+    parser = SRLParser()
+    result = parser.parse(
+        "PREFIX : <http://example.org/>\n"
+        "RULE { ?x :r ?y } WHERE { ?x :p ?y . ?x :p ?y FILTER(?y > 1) ?y :q ?z FILTER(?y > 1) }"
+    )
+
+    assert len(result.rules[0].body.elements) == 3
+
+
+def test_filters_repeated_around_a_binding_are_kept():
+    """A repeated filter is kept when an element in between can change its result."""
+    parser = SRLParser()
+    result = parser.parse(
+        "PREFIX : <http://example.org/>\n"
+        "RULE { ?x :r ?z } WHERE {\n"
+        "    ?x :p ?z . FILTER(!BOUND(?y)) BIND(1 AS ?y) FILTER(!BOUND(?y))\n"
+        "}\n"
+        "RULE { ?x :r ?y } WHERE { ?x :p ?y FILTER(RAND() < 0.5) FILTER(RAND() < 0.5) }"
+    )
+
+    assert len(result.rules[0].body.elements) == 4
+    assert len(result.rules[1].body.elements) == 3
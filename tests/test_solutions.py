@@ -0,0 +1,66 @@
+"""Test solution mapping operations."""
+
+from rdflib import Graph, Namespace
+
+from srl.ast.nodes import IRI, Literal, TriplePattern, Variable
+from srl.engine.solutions import (
+    SolutionMapping,
+    graphMatch,
+    join,
+    join_pattern,
+    minus,
+    substitute_term,
+)
+
+EX = Namespace("http://example.org/")
+
+
+def test_join_on_shared_variable():
+    """Mappings join only where they agree on shared variables."""
+    left = [SolutionMapping({"x": EX.a, "y": EX.b}), SolutionMapping({"x": EX.c, "y": EX.d})]
+    right = [SolutionMapping({"y": EX.b, "z": EX.e}), SolutionMapping({"y": EX.f, "z": EX.g})]
+    assert join(left, right) == [SolutionMapping({"x": EX.a, "y": EX.b, "z": EX.e})]
+
+
+def test_minus_keeps_incompatible_mappings():
+    """minus drops mappings compatible with any mapping on the right."""
+    left = [SolutionMapping({"x": EX.a}), SolutionMapping({"x": EX.b})]
+    right = [SolutionMapping({"x": EX.a, "y": EX.c})]
+    assert minus(left, right) == [SolutionMapping({"x": EX.b})]
+    assert minus(left, [SolutionMapping({"y": EX.c})]) == []
+    assert minus(left, []) == left
+
+
+def test_join_pattern_probes_per_mapping():
+    """The index nested-loop join agrees with matching the pattern and hash-joining."""
+    graph = Graph()
+    for i in range(10):
+        graph.add((EX[f"s{i}"], EX.p, EX[f"o{i}"]))
+    omega = [SolutionMapping({"x": EX.s1}), SolutionMapping({"x": EX.s2, "z": EX.a})]
+    pattern = TriplePattern(Variable("x"), IRI(str(EX.p)), Variable("y"))
+
+    expected = join(omega, graphMatch(graph, pattern))
+    assert join_pattern(omega, pattern, graph) == expected
+    assert len(expected) == 2
+
+    # y is bound by only one mapping, so it is not in the common domain
+    omega = [SolutionMapping({"x": EX.s1, "y": EX.o1}), SolutionMapping({"x": EX.s2})]
+    expected = join(omega, graphMatch(graph, pattern))
+    assert join_pattern(omega, pattern, graph) == expected
+    assert len(expected) == 2
+
+    for i in range(10):
+        graph.add((EX.s1, EX.p, EX[f"extra{i}"]))
+    omega = [SolutionMapping({"x": EX.s1, "y": EX.o1}), SolutionMapping({"x": EX.s3})]
+    expected = join(omega, graphMatch(graph, pattern))
+    assert join_pattern(omega, pattern, graph) == expected
+    assert len(expected) == 2
+
+
+def test_constants_convert_to_shared_terms():
+    """Equal AST constants convert to one rdflib term instance."""
+    mu = SolutionMapping()
+    assert substitute_term(IRI(str(EX.a)), mu) is substitute_term(IRI(str(EX.a)), mu)
+    assert substitute_term(Literal("x", language="en"), mu) is substitute_term(
+        Literal("x", language="en"), mu
+    )
@@ -0,0 +1,75 @@
+"""Test the rdflib BGP evaluator hook."""
+
+import pytest
+from rdflib import Graph
+from rdflib.plugins.sparql import CUSTOM_EVALS
+
+from srl.engine.sparqleval import evalBGP, register, unregister
+
+DATA = """
+PREFIX : <http://example.org/>
+:alice :knows :bob, :carol ; :age 30 .
+:bob :knows :carol ; :age 25 .
+:carol :knows :carol ; :age 41 .
+"""
+
+QUERY = """
+PREFIX : <http://example.org/>
+SELECT ?x ?y ?a WHERE {
+    ?x :knows ?y .
+    ?y :age ?a .
+    ?y :knows ?y .
+    FILTER(?a > 20)
+}
+"""
+
+
+def _rows(graph):
+    return sorted(tuple(row) for row in graph.query(QUERY))
+
+
+def test_evalbgp_matches_rdflib():
+    """Results through the registered BGP evaluator equal rdflib's own."""
+    graph = Graph().parse(data=DATA, format="turtle")
+    expected = _rows(graph)
+
+    register()
+    try:
+        assert CUSTOM_EVALS["srl_bgp"] is evalBGP
+        assert _rows(graph) == expected
+    finally:
+        unregister()
+    assert "srl_bgp" not in CUSTOM_EVALS
+
+    assert len(expected) == 3
+
+
+BNODE_DATA = """
+PREFIX : <http://example.org/>
+:a :r [] .
+:c :q "x" .
+"""
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT ?o ?z WHERE { :a :r ?o OPTIONAL { ?o :q ?z } }",
+        "SELECT ?o WHERE { :a :r ?o FILTER EXISTS { ?o :q ?z } }",
+        "SELECT ?o WHERE { :a :r ?o FILTER NOT EXISTS { ?o :q ?z } }",
+    ],
+)
+def test_bound_blank_node_is_a_constant(query):
+    """A blank node bound by an outer pattern does not match as a wildcard."""
+    graph = Graph().parse(data=BNODE_DATA, format="turtle")
+    query = "PREFIX : <http://example.org/>\n" + query
+
+    def rows():
+        return sorted(tuple(row) for row in graph.query(query))
+
+    expected = rows()
+    register()
+    try:
+        assert rows() == expected
+    finally:
+        unregister()
@@ -0,0 +1,108 @@
+"""Test rule stratification."""
+
+import pytest
+
+from srl.engine.stratification import (
+    StrataInfo,
+    StratificationError,
+    detect_negation_cycles,
+    is_self_recursive,
+    stratify_rules,
+)
+from srl.parser import SRLParser
+
+PREFIX = "PREFIX : <http://example.org/>\n"
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return SRLParser()
+
+
+def test_negation_raises_stratum(parser):
+    """A rule negating another rule's head is placed in a later stratum."""
+    rule_set = parser.parse(
+        PREFIX
+        + """
+        RULE { ?x :q ?y } WHERE { ?x :p ?y }
+        RULE { ?x :r ?y } WHERE { ?x :p ?y NOT { ?x :q ?y } }
+        """
+    )
+    assert stratify_rules(rule_set) == [[0], [1]]
+
+
+def test_positive_dependency_on_later_stratum(parser):
+    """A rule reading a negating rule's output is not evaluated before it."""
+    rule_set = parser.parse(
+        PREFIX
+        + """
+        RULE { ?x :s ?y } WHERE { ?x :r ?y }
+        RULE { ?x :q ?y } WHERE { ?x :p ?y }
+        RULE { ?x :r ?y } WHERE { ?x :p ?y NOT { ?x :q ?y } }
+        """
+    )
+    assert stratify_rules(rule_set) == [[1], [0, 2]]
+
+
+def test_recursive_rules_share_stratum(parser):
+    """Mutually recursive rules without negation land in one stratum."""
+    rule_set = parser.parse(
+        PREFIX
+        + """
+        RULE { ?x :a ?y } WHERE { ?x :b ?y }
+        RULE { ?x :b ?y } WHERE { ?x :a ?y }
+        """
+    )
+    assert stratify_rules(rule_set) == [[0, 1]]
+
+
+def test_cycle_through_negation(parser):
+    """Recursion through negation is rejected."""
+    rule_set = parser.parse(
+        PREFIX
+        + """
+        RULE { ?x :a ?y } WHERE { ?x :p ?y NOT { ?x :b ?y } }
+        RULE { ?x :b ?y } WHERE { ?x :a ?y }
+        """
+    )
+    with pytest.raises(StratificationError):
+        stratify_rules(rule_set)
+
+
+def test_long_negation_cycle_without_recursion():
+    """Cycle detection handles dependency chains deeper than the recursion limit."""
+    n = 5000
+    dependencies = [StrataInfo(i, -1, 1 << (i + 1) if i + 1 < n else 0, 0) for i in range(n)]
+    detect_negation_cycles(dependencies)
+
+    dependencies[-1].negatively_depends_on |= 1
+    with pytest.raises(StratificationError, match=f"{n - 1} -> 0 -> 1"):
+        detect_negation_cycles(dependencies)
+
+
+def test_negation_cycle_message_names_cycle(parser):
+    """The stratification error spells out the offending cycle."""
+    rule_set = parser.parse(
+        PREFIX
+        + """
+        RULE { ?x :a ?y } WHERE { ?x :p ?y NOT { ?x :b ?y } }
+        RULE { ?x :b ?y } WHERE { ?x :c ?y }
+        RULE { ?x :c ?y } WHERE { ?x :a ?y }
+        """
+    )
+    with pytest.raises(StratificationError, match="0 -> 1 -> 2 -> 0"):
+        stratify_rules(rule_set)
+
+
+def test_self_recursion(parser):
+    """Only rules whose head can feed their own body are self-recursive."""
+    rule_set = parser.parse(
+        PREFIX
+        + """
+        RULE { ?x :q ?y } WHERE { ?x :p ?y }
+        RULE { ?x :p ?z } WHERE { ?x :p ?y . ?y :p ?z }
+        RULE { ?x :q ?y } WHERE { ?x :p/:p ?y }
+        RULE { ?x ?p ?y } WHERE { ?x :r ?y . ?x :s ?p }
+        """
+    )
+    assert [is_self_recursive(rule) for rule in rule_set.rules] == [False, True, True, True]